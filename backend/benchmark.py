@@ -0,0 +1,517 @@
+# brasfut-app/backend/benchmark.py
+
+"""Benchmark do backend com uma base sintética do Brasfut.
+
+Gera uma base SQLite temporária (usuários, grafo de follows em lei de
+potência, posts, likes e comentários em proporções realistas), exercita
+todas as rotas do app.py pelo test client do Flask e, com --http, também
+por HTTP de verdade com concorrência. Reporta p50/p95/p99, vazão e
+consultas SQL por requisição, e pode gravar/comparar uma linha de base
+para que regressões em get_posts ou get_followed_posts apareçam como diff.
+
+Roda totalmente offline. Exemplos (a partir de backend/):
+
+    python benchmark.py --users 500 --posts 10000 --save-baseline base.json
+    python benchmark.py --users 500 --posts 10000 --compare base.json
+    python benchmark.py --http --concurrency 16 --requests 500
+"""
+
+import argparse
+import http.client
+import itertools
+import json
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+
+BENCH_PASSWORD = 'senha123'
+
+
+# Geração da base sintética
+# =========================
+
+
+def zipf_cum_weights(n, s):
+    total = 0.0
+    cumulative = []
+    for rank in range(1, n + 1):
+        total += 1.0 / rank ** s
+        cumulative.append(total)
+    return cumulative
+
+
+def generate_dataset(app_module, app, args, rng):
+    """Popula a base com inserts em lote e devolve os dados usados nos cenários."""
+    db = app_module.db
+    User, Post, Comment, Like, Follow = (app_module.User, app_module.Post,
+                                         app_module.Comment, app_module.Like,
+                                         app_module.Follow)
+    password_hash = app_module.hasher.hash(BENCH_PASSWORD)
+    now = time.time()
+    user_ids = list(range(1, args.users + 1))
+    # Popularidade em lei de potência: poucos clubes/jogadores concentram
+    # seguidores, posts e likes.
+    popularity = zipf_cum_weights(args.users, 1.1)
+
+    with app.app_context():
+        app_module.upgrade_database()
+        db.session.execute(db.insert(User), [
+            {"id": user_id, "username": f"torcedor{user_id}",
+             "email": f"torcedor{user_id}@brasfut.test", "password_hash": password_hash}
+            for user_id in user_ids])
+
+        follows = set()
+        for follower in user_ids:
+            wanted = min(args.users - 1, int(rng.paretovariate(1.5) * args.follows_per_user / 3))
+            for followed in rng.choices(user_ids, cum_weights=popularity, k=wanted):
+                if followed != follower:
+                    follows.add((follower, followed))
+        db.session.execute(db.insert(Follow), [
+            {"follower_id": a, "followed_id": b,
+             "timestamp": _dt(now - rng.uniform(0, 90 * 86400))} for a, b in follows])
+
+        authors = rng.choices(user_ids, cum_weights=popularity, k=args.posts)
+        posts = []
+        for post_id, author in enumerate(authors, start=1):
+            posts.append({"id": post_id, "user_id": author,
+                          "body": f"Post {post_id} sobre o Brasileirão #rodada{post_id % 38 + 1}",
+                          "timestamp": _dt(now - rng.uniform(0, 30 * 86400))})
+        for chunk in _chunked(posts, 5000):
+            db.session.execute(db.insert(Post), chunk)
+
+        post_ids = list(range(1, args.posts + 1))
+        post_popularity = zipf_cum_weights(args.posts, 1.0)
+        likes = set()
+        for post_id in rng.choices(post_ids, cum_weights=post_popularity,
+                                   k=int(args.posts * args.likes_per_post)):
+            likes.add((rng.choice(user_ids), post_id))
+        for chunk in _chunked([{"user_id": u, "post_id": p, "timestamp": _dt(now)}
+                               for u, p in likes], 5000):
+            db.session.execute(db.insert(Like), chunk)
+
+        comments = [{"user_id": rng.choice(user_ids), "post_id": post_id,
+                     "body": "Que golaço!", "timestamp": _dt(now - rng.uniform(0, 86400))}
+                    for post_id in rng.choices(post_ids, cum_weights=post_popularity,
+                                               k=int(args.posts * args.comments_per_post))]
+        for chunk in _chunked(comments, 5000):
+            db.session.execute(db.insert(Comment), chunk)
+        db.session.commit()
+
+        # Contadores, timelines, índice de busca e tags, como após um import;
+        # depois os baldes de trending da janela e as sugestões pré-calculadas.
+        app_module.rebuild_derived_data()
+        trending = app_module.trending
+        window_start = trending.epoch_minute(_dt(now)) - app.config['TRENDING_WINDOW_MINUTES']
+        for post in posts:
+            minute = trending.epoch_minute(post["timestamp"])
+            if minute > window_start:
+                app_module.upsert_trend_buckets(trending.extract_tags(post["body"]), minute, 1)
+        db.session.commit()
+        app_module.compute_all_suggestions(progress=lambda message: None)
+
+    return {"user_ids": user_ids, "post_ids": post_ids, "follows": follows,
+            "likes": likes, "popularity": popularity, "post_popularity": post_popularity}
+
+
+def _dt(epoch):
+    import datetime
+    return datetime.datetime.fromtimestamp(epoch, datetime.timezone.utc)
+
+
+def _chunked(rows, size):
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+# Cenários (uma entrada por rota)
+# ===============================
+# Cada cenário devolve (método, url, corpo JSON). Os de escrita consomem
+# pares gerados sem conflito (ex.: like em post ainda não curtido) para medir
+# o caminho de sucesso, e os pares like/unlike e follow/unfollow desfazem um
+# ao outro para a base não derivar entre execuções.
+
+
+class Scenarios:
+    def __init__(self, data, rng, signer):
+        self.data = data
+        self.rng = rng
+        self.signer = signer
+        self._tokens = {}
+        self.created_posts = []
+        self._lock = threading.Lock()
+        self._new_likes = []
+        self._new_follows = []
+        # Compartilhado entre execuções para não repetir usernames
+        self._serial = data.setdefault("serial", itertools.count(1))
+
+    def auth(self, user_id):
+        # Assina direto com o TokenSigner do app: o custo do login (hash de
+        # senha) já é medido no cenário próprio.
+        if user_id not in self._tokens:
+            self._tokens[user_id] = self.signer.issue(user_id, f"torcedor{user_id}")
+        return {'Authorization': 'Bearer ' + self._tokens[user_id]}
+
+    def user(self):
+        return self.rng.choices(self.data["user_ids"], cum_weights=self.data["popularity"])[0]
+
+    def viewer(self):
+        return self.rng.choice(self.data["user_ids"])
+
+    def post(self):
+        return self.rng.choices(self.data["post_ids"], cum_weights=self.data["post_popularity"])[0]
+
+    def search_term(self):
+        return quote(self.rng.choice(["golaço", "brasileirão", f"rodada{self.rng.randint(1, 38)}"]))
+
+    def build(self):
+        s = self
+        return {
+            "index": lambda: ("GET", "/", None, None),
+            "get_posts": lambda: ("GET", f"/posts?limit=20&logged_in_user_id={s.viewer()}", None, None),
+            "get_posts_page5": lambda: s._deep_page(),
+            "get_single_post": lambda: ("GET", f"/posts/{s.post()}?logged_in_user_id={s.viewer()}", None, None),
+            "get_posts_batch": lambda: ("POST", "/posts/batch", {
+                "ids": [s.post() for _ in range(20)], "logged_in_user_id": s.viewer()}, None),
+            "get_user_profile": lambda: ("GET", f"/users/torcedor{s.user()}?limit=20&logged_in_user_id={s.viewer()}", None, None),
+            "get_followed_posts": lambda: ("GET", f"/posts/followed/{s.viewer()}?limit=20&logged_in_user_id={s.viewer()}", None, None),
+            "get_comments": lambda: ("GET", f"/posts/{s.post()}/comments?limit=20", None, None),
+            "is_following": lambda: ("GET", f"/is_following/{s.viewer()}/{s.user()}", None, None),
+            "search": lambda: ("GET", f"/search?q={s.search_term()}&limit=20&logged_in_user_id={s.viewer()}", None, None),
+            "trending": lambda: ("GET", "/trending?limit=10", None, None),
+            "tag_feed": lambda: ("GET", f"/tags/rodada{s.rng.randint(1, 38)}?limit=20&logged_in_user_id={s.viewer()}", None, None),
+            "suggestions": lambda: ("GET", f"/users/{s.viewer()}/suggestions?limit=10", None, None),
+            "cache_stats": lambda: ("GET", "/cache/stats", None, None),
+            "events_stats": lambda: ("GET", "/events/stats", None, None),
+            "login": lambda: ("POST", "/login", {"username": f"torcedor{s.viewer()}",
+                                                  "password": BENCH_PASSWORD}, None),
+            "register": lambda: s._register(),
+            "create_post": lambda: ("POST", "/posts", {"body": "Gol do Brasfut! #bench"},
+                                    s.auth(s.user())),
+            "add_comment": lambda: ("POST", f"/posts/{s.post()}/comments",
+                                    {"body": "Comentário de bench"}, s.auth(s.viewer())),
+            "like_post": lambda: s._like(),
+            "unlike_post": lambda: s._unlike(),
+            "follow_user": lambda: s._follow(),
+            "unfollow_user": lambda: s._unfollow(),
+            "delete_post": lambda: s._delete(),
+        }
+
+    def _deep_page(self):
+        # Cursor de uma página funda: mede se a paginação keyset custa o mesmo
+        # que a primeira página.
+        return ("GET", "/posts?limit=20&before=" + self.data["deep_cursor"], None, None)
+
+    def _register(self):
+        serial = next(self._serial)
+        return ("POST", "/register", {"username": f"novo{serial}",
+                                      "email": f"novo{serial}@brasfut.test",
+                                      "password": BENCH_PASSWORD}, None)
+
+    def _like(self):
+        while True:
+            pair = (self.viewer(), self.post())
+            with self._lock:
+                if pair not in self.data["likes"]:
+                    self.data["likes"].add(pair)
+                    self._new_likes.append(pair)
+                    break
+        return ("POST", f"/posts/{pair[1]}/like", {}, self.auth(pair[0]))
+
+    def _unlike(self):
+        with self._lock:
+            pair = self._new_likes.pop() if self._new_likes else None
+            if pair:
+                self.data["likes"].discard(pair)
+        if pair is None:
+            return None
+        return ("POST", f"/posts/{pair[1]}/unlike", {}, self.auth(pair[0]))
+
+    def _follow(self):
+        while True:
+            pair = (self.viewer(), self.user())
+            with self._lock:
+                if pair[0] != pair[1] and pair not in self.data["follows"]:
+                    self.data["follows"].add(pair)
+                    self._new_follows.append(pair)
+                    break
+        return ("POST", f"/follow/{pair[1]}", {}, self.auth(pair[0]))
+
+    def _unfollow(self):
+        with self._lock:
+            pair = self._new_follows.pop() if self._new_follows else None
+            if pair:
+                self.data["follows"].discard(pair)
+        if pair is None:
+            return None
+        return ("POST", f"/unfollow/{pair[1]}", {}, self.auth(pair[0]))
+
+    def _delete(self):
+        with self._lock:
+            post = self.created_posts.pop() if self.created_posts else None
+        if post is None:
+            return None
+        return ("DELETE", f"/posts/{post[0]}", {}, self.auth(post[1]))
+
+
+# Ordem de execução: leituras primeiro, depois escritas e as que as desfazem
+SCENARIO_ORDER = [
+    "index", "get_posts", "get_posts_page5", "get_single_post", "get_posts_batch",
+    "get_user_profile", "get_followed_posts", "get_comments", "is_following",
+    "search", "trending", "tag_feed", "suggestions", "cache_stats", "events_stats", "login", "register", "create_post",
+    "add_comment", "like_post", "unlike_post", "follow_user", "unfollow_user",
+    "delete_post",
+]
+
+
+# Medição
+# =======
+
+
+class QueryCounter:
+    """Conta os statements executados nas engines do app."""
+
+    def __init__(self, engines):
+        self.count = 0
+        from sqlalchemy import event
+        for engine in engines:
+            event.listen(engine, 'before_cursor_execute', self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1,
+                      int(round(pct / 100.0 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+def summarize(name, latencies, queries, errors, elapsed):
+    latencies.sort()
+    return {
+        "route": name,
+        "requests": len(latencies),
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "queries_per_request": round(queries / len(latencies), 2) if queries is not None and latencies else None,
+    }
+
+
+def _record_created(scenarios, status, payload):
+    if status == 201 and payload and "post" in payload:
+        with scenarios._lock:
+            scenarios.created_posts.append((payload["post"]["id"], payload["post"]["user_id"]))
+
+
+def run_test_client(app_module, app, scenarios, requests_per_route):
+    client = app.test_client()
+    with app.app_context():
+        counter = QueryCounter(app_module.db.engines.values())
+    builders = scenarios.build()
+    results = []
+    for name in SCENARIO_ORDER:
+        latencies, errors, queries = [], 0, 0
+        started = time.perf_counter()
+        for _ in range(requests_per_route):
+            request_spec = builders[name]()
+            if request_spec is None:
+                break
+            method, url, body, headers = request_spec
+            before = counter.count
+            t0 = time.perf_counter()
+            response = client.open(url, method=method, json=body, headers=headers)
+            latencies.append(time.perf_counter() - t0)
+            queries += counter.count - before
+            if response.status_code >= 400:
+                errors += 1
+            _record_created(scenarios, response.status_code, response.get_json(silent=True))
+        results.append(summarize(name, latencies, queries, errors,
+                                 time.perf_counter() - started))
+    return results
+
+
+def run_http(app_module, app, scenarios, requests_per_route, concurrency):
+    from werkzeug.serving import make_server
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    port = server.server_port
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    local = threading.local()
+
+    def send(request_spec):
+        if request_spec is None:
+            return None
+        method, url, body, headers = request_spec
+        if not hasattr(local, 'conn'):
+            local.conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        payload = json.dumps(body) if body is not None else None
+        headers = dict(headers or {})
+        if body is not None:
+            headers['Content-Type'] = 'application/json'
+        t0 = time.perf_counter()
+        try:
+            local.conn.request(method, url, body=payload, headers=headers)
+            response = local.conn.getresponse()
+            data = response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            local.conn.close()
+            del local.conn
+            return time.perf_counter() - t0, 599
+        elapsed = time.perf_counter() - t0
+        if status == 201:
+            _record_created(scenarios, status, json.loads(data))
+        return elapsed, status
+
+    builders = scenarios.build()
+    results = []
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for name in SCENARIO_ORDER:
+                specs = [builders[name]() for _ in range(requests_per_route)]
+                started = time.perf_counter()
+                outcomes = [o for o in pool.map(send, specs) if o is not None]
+                elapsed = time.perf_counter() - started
+                results.append(summarize(
+                    name, [o[0] for o in outcomes], None,
+                    sum(1 for o in outcomes if o[1] >= 400), elapsed))
+    finally:
+        server.shutdown()
+    return results
+
+
+# Relatório e linha de base
+# =========================
+
+
+def print_report(title, results):
+    print(f"\n{title}")
+    header = f"{'rota':<22}{'reqs':>6}{'erros':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>10}{'SQL/req':>9}"
+    print(header)
+    print('-' * len(header))
+    for row in results:
+        qpr = '-' if row["queries_per_request"] is None else f"{row['queries_per_request']:.1f}"
+        print(f"{row['route']:<22}{row['requests']:>6}{row['errors']:>7}{row['p50_ms']:>10.2f}"
+              f"{row['p95_ms']:>10.2f}{row['p99_ms']:>10.2f}{row['rps']:>10.1f}{qpr:>9}")
+
+
+def compare_with_baseline(report, baseline, threshold, min_delta_ms):
+    """Imprime o diff contra a linha de base e devolve o número de regressões.
+
+    Diferenças abaixo de min_delta_ms são ignoradas: em rotas de menos de um
+    milissegundo o ruído de medição passa fácil de qualquer limite relativo.
+    """
+    regressions = 0
+    print(f"\nComparação com a linha de base (limite {threshold:.0%}):")
+    for mode, results in report["results"].items():
+        base_rows = {row["route"]: row for row in baseline.get("results", {}).get(mode, [])}
+        for row in results:
+            base = base_rows.get(row["route"])
+            if not base:
+                continue
+            notes = []
+            for key in ("p50_ms", "p95_ms"):
+                if (row[key] > base[key] * (1 + threshold)
+                        and row[key] - base[key] >= min_delta_ms):
+                    notes.append(f"{key} {base[key]:.2f} -> {row[key]:.2f}")
+            if (row["queries_per_request"] is not None and base.get("queries_per_request") is not None
+                    and row["queries_per_request"] > base["queries_per_request"]):
+                notes.append(f"SQL/req {base['queries_per_request']} -> {row['queries_per_request']}")
+            if notes:
+                regressions += 1
+                print(f"  REGRESSÃO [{mode}] {row['route']}: " + "; ".join(notes))
+    if not regressions:
+        print("  Nenhuma regressão.")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=300)
+    parser.add_argument('--posts', type=int, default=5000)
+    parser.add_argument('--follows-per-user', type=float, default=20)
+    parser.add_argument('--likes-per-post', type=float, default=4)
+    parser.add_argument('--comments-per-post', type=float, default=0.8)
+    parser.add_argument('--requests', type=int, default=100, help='requisições por rota')
+    parser.add_argument('--seed', type=int, default=2024)
+    parser.add_argument('--cache', default='null', choices=['null', 'memory'],
+                        help="backend de cache do app durante o benchmark")
+    parser.add_argument('--http', action='store_true', help='também mede por HTTP real')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--save-baseline', metavar='ARQUIVO')
+    parser.add_argument('--compare', metavar='ARQUIVO')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='piora relativa de latência considerada regressão')
+    parser.add_argument('--min-delta-ms', type=float, default=1.0,
+                        help='piora absoluta mínima para contar como regressão')
+    parser.add_argument('--keep-db', action='store_true')
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix='brasfut-bench-')
+    db_path = os.path.join(workdir, 'bench.db')
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import app as app_module
+    app = app_module.create_app({
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + db_path,
+        'CACHE_BACKEND': args.cache,
+        # O cenário de login repete o mesmo IP centenas de vezes
+        'LOGIN_MAX_ATTEMPTS_PER_IP': 0,
+    })
+
+    rng = random.Random(args.seed)
+    try:
+        t0 = time.perf_counter()
+        data = generate_dataset(app_module, app, args, rng)
+        print(f"Base gerada em {time.perf_counter() - t0:.1f}s: {args.users} usuários, "
+              f"{len(data['follows'])} follows, {args.posts} posts, {len(data['likes'])} likes "
+              f"({db_path})")
+
+        with app.test_client() as client:
+            cursor = None
+            for _ in range(5):
+                page = client.get('/posts?limit=20' + (f'&before={cursor}' if cursor else '')).get_json()
+                cursor = page["next_cursor"] or cursor
+        data["deep_cursor"] = cursor or ''
+
+        report = {"dataset": {k: getattr(args, k) for k in
+                              ("users", "posts", "follows_per_user", "likes_per_post",
+                               "comments_per_post", "seed", "cache")},
+                  "results": {}}
+        report["results"]["test_client"] = run_test_client(
+            app_module, app, Scenarios(data, rng, app_module.tokens), args.requests)
+        print_report("Test client (sequencial)", report["results"]["test_client"])
+        if args.http:
+            report["results"]["http"] = run_http(
+                app_module, app, Scenarios(data, rng, app_module.tokens), args.requests,
+                args.concurrency)
+            print_report(f"HTTP ({args.concurrency} conexões)", report["results"]["http"])
+
+        if args.save_baseline:
+            with open(args.save_baseline, 'w') as f:
+                json.dump(report, f, indent=2)
+            print(f"\nLinha de base gravada em {args.save_baseline}")
+        if args.compare:
+            with open(args.compare) as f:
+                if compare_with_baseline(report, json.load(f), args.threshold,
+                                         args.min_delta_ms):
+                    return 1
+        return 0
+    finally:
+        if not args.keep_db:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
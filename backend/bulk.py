@@ -0,0 +1,281 @@
+# brasfut-app/backend/bulk.py
+
+"""Importação e exportação em lote (NDJSON ou CSV) de usuários, posts,
+follows, likes e comentários.
+
+A importação lê o arquivo em streaming e grava em lotes: cada lote é
+validado (campos, tamanhos e chaves estrangeiras, estas com uma consulta
+por tabela referenciada), inserido com um único executemany e commitado
+na sua própria transação. Linhas já existentes são ignoradas (INSERT ... ON
+CONFLICT DO NOTHING), então reprocessar um lote é seguro desde que cada
+linha traga sua chave única (por isso posts e comentários exigem o `id`);
+linhas inválidas (inclusive linhas NDJSON que não são JSON) vão para
+`<arquivo>.rejects` com a posição e o motivo. Depois de cada
+commit o checkpoint (`<arquivo>.checkpoint`) registra quantos registros já
+foram processados, e uma nova execução continua dali. Uma queda entre o
+commit e o checkpoint só faz o último lote ser reprocessado.
+
+A exportação lê com yield_per (cursor no servidor quando o driver
+permite), então a memória não cresce com o tamanho da tabela.
+"""
+
+import csv
+import datetime
+import json
+import os
+import time
+
+IN_CHUNK_SIZE = 900
+
+
+class RejectedRow(Exception):
+    pass
+
+
+REQUIRED = object()
+
+
+class MalformedRecord(str):
+    """Linha do NDJSON que não virou um objeto; vai crua para o .rejects."""
+
+    def __new__(cls, line, reason):
+        record = super().__new__(cls, line)
+        record.reason = reason
+        return record
+
+
+class Entity:
+    """Como ler, validar e gravar as linhas de uma tabela.
+
+    fields: {coluna: (conversor, padrão)}, onde o padrão é REQUIRED, None
+    ou uma função chamada para cada linha sem o campo. Toda linha sai com
+    as mesmas colunas, como o executemany exige. refs: {coluna: modelo
+    referenciado}, conferidas em lote antes do insert. check recebe a linha
+    convertida e pode ajustá-la ou levantar RejectedRow.
+    """
+
+    def __init__(self, model, fields, refs=None, check=None):
+        self.model = model
+        self.fields = fields
+        self.refs = refs or {}
+        self.check = check
+
+    def coerce(self, record):
+        if isinstance(record, MalformedRecord):
+            raise RejectedRow(record.reason)
+        row = {}
+        for column, (convert, default) in self.fields.items():
+            value = record.get(column)
+            if value in (None, ''):
+                if default is REQUIRED:
+                    raise RejectedRow(f"campo obrigatório ausente: {column}")
+                row[column] = default() if callable(default) else default
+                continue
+            try:
+                row[column] = convert(value)
+            except (TypeError, ValueError) as e:
+                raise RejectedRow(f"{column} inválido: {e}")
+        if self.check:
+            self.check(row)
+        return row
+
+
+def to_int(value):
+    return int(value)
+
+
+def to_datetime(value):
+    if isinstance(value, datetime.datetime):
+        return value
+    moment = datetime.datetime.fromisoformat(value)
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+def text(max_length):
+    def convert(value):
+        value = str(value)
+        if len(value) > max_length:
+            raise ValueError(f"mais de {max_length} caracteres")
+        return value
+    return convert
+
+
+def read_records(path, file_format):
+    """Itera os registros do arquivo como dicts, em streaming."""
+    with open(path, newline='', encoding='utf-8') as f:
+        if file_format == 'csv':
+            yield from csv.DictReader(f)
+            return
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            # Uma linha corrompida é rejeitada sozinha e continua contando
+            # como processada, para o checkpoint seguir alinhado.
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield MalformedRecord(line, f"JSON inválido: {e}")
+                continue
+            if not isinstance(record, dict):
+                yield MalformedRecord(line, "registro não é um objeto JSON")
+                continue
+            yield record
+
+
+def detect_format(path, file_format=None):
+    if file_format:
+        return file_format
+    return 'csv' if path.lower().endswith('.csv') else 'ndjson'
+
+
+class Checkpoint:
+    def __init__(self, path):
+        self.path = path
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return 0
+        with open(self.path) as f:
+            return json.load(f)["processed"]
+
+    def save(self, processed):
+        # Grava em arquivo temporário e renomeia: um kill no meio da escrita
+        # nunca deixa um checkpoint truncado.
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({"processed": processed}, f)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def _existing_ids(session, model, ids):
+    found = set()
+    ids = list(ids)
+    for start in range(0, len(ids), IN_CHUNK_SIZE):
+        chunk = ids[start:start + IN_CHUNK_SIZE]
+        found.update(row_id for (row_id,) in session.query(model.id).filter(model.id.in_(chunk)))
+    return found
+
+
+def import_file(session, entity, path, insert_statement, file_format=None,
+                batch_size=5000, progress=print, restart=False):
+    """Importa o arquivo em lotes.
+
+    Devolve (processados nesta execução, inseridos, rejeitados).
+    """
+    checkpoint = Checkpoint(path + '.checkpoint')
+    if restart:
+        checkpoint.clear()
+    skip = checkpoint.load()
+    if skip:
+        progress(f"Retomando do checkpoint: {skip} registro(s) já processado(s).")
+
+    processed, inserted, rejected = skip, 0, 0
+    started = time.monotonic()
+    with open(path + '.rejects', 'a', encoding='utf-8') as rejects:
+        records = read_records(path, detect_format(path, file_format))
+        for _ in range(skip):
+            next(records, None)
+
+        batch = []
+        for record in records:
+            batch.append(record)
+            if len(batch) >= batch_size:
+                inserted_now, rejected_now = _import_batch(
+                    session, entity, batch, insert_statement, rejects, processed)
+                processed += len(batch)
+                inserted += inserted_now
+                rejected += rejected_now
+                checkpoint.save(processed)
+                batch = []
+                rate = (processed - skip) / max(time.monotonic() - started, 1e-6)
+                progress(f"{processed} registro(s) processado(s), {inserted} inserido(s), "
+                         f"{rejected} rejeitado(s) ({rate:.0f}/s)")
+        if batch:
+            inserted_now, rejected_now = _import_batch(
+                session, entity, batch, insert_statement, rejects, processed)
+            processed += len(batch)
+            inserted += inserted_now
+            rejected += rejected_now
+    checkpoint.clear()
+    if not rejected and os.path.getsize(path + '.rejects') == 0:
+        os.remove(path + '.rejects')
+    return processed - skip, inserted, rejected
+
+
+def _import_batch(session, entity, records, insert_statement, rejects, offset):
+    rows, positions = [], []
+    rejected = 0
+    for position, record in enumerate(records, start=offset + 1):
+        try:
+            rows.append(entity.coerce(record))
+            positions.append(position)
+        except RejectedRow as e:
+            rejects.write(json.dumps({"position": position, "reason": str(e), "record": record},
+                                     default=str) + '\n')
+            rejected += 1
+
+    # Chaves estrangeiras conferidas em lote: uma consulta por tabela
+    # referenciada, em vez de depender do banco abortar o lote inteiro.
+    for column, model in entity.refs.items():
+        existing = _existing_ids(session, model, {row[column] for row in rows})
+        valid_rows, valid_positions = [], []
+        for row, position in zip(rows, positions):
+            if row[column] in existing:
+                valid_rows.append(row)
+                valid_positions.append(position)
+            else:
+                rejects.write(json.dumps({"position": position,
+                                          "reason": f"{column} {row[column]} não existe",
+                                          "record": row}, default=str) + '\n')
+                rejected += 1
+        rows, positions = valid_rows, valid_positions
+
+    inserted = 0
+    if rows:
+        try:
+            result = session.execute(insert_statement, rows)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        inserted = max(result.rowcount, 0)
+    else:
+        session.commit()
+    rejects.flush()
+    return inserted, rejected
+
+
+def export_file(session, model, columns, path, file_format=None, batch_size=5000,
+                progress=print, criteria=()):
+    """Exporta a tabela em streaming; devolve o número de linhas escritas.
+
+    `criteria` filtra as linhas exportadas.
+    """
+    file_format = detect_format(path, file_format)
+    query = session.query(*[getattr(model, column) for column in columns]).filter(
+        *criteria).order_by(
+        *model.__table__.primary_key.columns).execution_options(yield_per=batch_size)
+    written = 0
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = None
+        if file_format == 'csv':
+            writer = csv.writer(f)
+            writer.writerow(columns)
+        for row in query:
+            values = [value.isoformat() if isinstance(value, datetime.datetime) else value
+                      for value in row]
+            if writer:
+                writer.writerow(values)
+            else:
+                f.write(json.dumps(dict(zip(columns, values)), ensure_ascii=False) + '\n')
+            written += 1
+            if written % (batch_size * 10) == 0:
+                progress(f"{written} linha(s) exportada(s)")
+    return written
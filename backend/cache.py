@@ -0,0 +1,221 @@
+# brasfut-app/backend/cache.py
+
+"""Cache de respostas com TTL e despejo LRU.
+
+O backend padrão guarda os valores em memória no próprio processo. Com
+CACHE_BACKEND = 'redis' os valores vão para um Redis (ou compatível) local,
+serializados em JSON, e o despejo LRU fica a cargo do `maxmemory-policy`
+do servidor. CACHE_BACKEND = 'null' desliga o cache sem mudar as rotas.
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+
+
+class CacheStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.sets = 0
+        self.deletes = 0
+        self.evictions = 0
+
+    def add(self, **deltas):
+        with self._lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
+
+    def as_dict(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "sets": self.sets,
+            "deletes": self.deletes,
+            "evictions": self.evictions,
+        }
+
+
+class MemoryCache:
+    """Dicionário ordenado por uso com expiração por entrada.
+
+    ttl=None usa o TTL padrão; ttl=0 grava sem expiração (a entrada ainda
+    pode ser despejada pelo LRU).
+    """
+
+    backend = 'memory'
+
+    def __init__(self, max_entries=10000, default_ttl=30):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.stats = CacheStats()
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _expires_at(self, ttl):
+        ttl = self.default_ttl if ttl is None else ttl
+        return time.monotonic() + ttl if ttl else None
+
+    def _lookup(self, key, now):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= now:
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return entry
+
+    def get(self, key):
+        with self._lock:
+            entry = self._lookup(key, time.monotonic())
+        if entry is None:
+            self.stats.add(misses=1)
+            return None
+        self.stats.add(hits=1)
+        return entry[1]
+
+    def get_many(self, keys):
+        now = time.monotonic()
+        found = {}
+        with self._lock:
+            for key in keys:
+                entry = self._lookup(key, now)
+                if entry is not None:
+                    found[key] = entry[1]
+        self.stats.add(hits=len(found), misses=len(keys) - len(found))
+        return found
+
+    def set(self, key, value, ttl=None):
+        self.set_many({key: value}, ttl)
+
+    def set_many(self, mapping, ttl=None):
+        expires_at = self._expires_at(ttl)
+        evicted = 0
+        with self._lock:
+            for key, value in mapping.items():
+                self._data[key] = (expires_at, value)
+                self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                evicted += 1
+        self.stats.add(sets=len(mapping), evictions=evicted)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+        self.stats.add(deletes=len(keys))
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def info(self):
+        return dict(self.stats.as_dict(), backend=self.backend,
+                    entries=len(self._data), max_entries=self.max_entries)
+
+
+class RedisCache:
+    """Mesma interface do MemoryCache sobre um servidor Redis."""
+
+    backend = 'redis'
+
+    def __init__(self, url, default_ttl=30, prefix='brasfut:'):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError(
+                "CACHE_BACKEND='redis' requer o pacote 'redis' instalado.")
+        self.default_ttl = default_ttl
+        self.prefix = prefix
+        self.stats = CacheStats()
+        self._client = redis.Redis.from_url(url)
+
+    def _ttl(self, ttl):
+        ttl = self.default_ttl if ttl is None else ttl
+        return ttl or None
+
+    def get(self, key):
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys):
+        if not keys:
+            return {}
+        raw = self._client.mget([self.prefix + key for key in keys])
+        found = {key: json.loads(value)
+                 for key, value in zip(keys, raw) if value is not None}
+        self.stats.add(hits=len(found), misses=len(keys) - len(found))
+        return found
+
+    def set(self, key, value, ttl=None):
+        self.set_many({key: value}, ttl)
+
+    def set_many(self, mapping, ttl=None):
+        ttl = self._ttl(ttl)
+        with self._client.pipeline() as pipe:
+            for key, value in mapping.items():
+                pipe.set(self.prefix + key, json.dumps(value), ex=ttl)
+            pipe.execute()
+        self.stats.add(sets=len(mapping))
+
+    def delete(self, *keys):
+        if keys:
+            self._client.delete(*[self.prefix + key for key in keys])
+        self.stats.add(deletes=len(keys))
+
+    def clear(self):
+        for key in self._client.scan_iter(match=self.prefix + '*'):
+            self._client.delete(key)
+
+    def info(self):
+        return dict(self.stats.as_dict(), backend=self.backend)
+
+
+class NullCache:
+    """Cache desligado: toda leitura é um miss e nada é gravado."""
+
+    backend = 'null'
+
+    def __init__(self):
+        self.stats = CacheStats()
+
+    def get(self, key):
+        self.stats.add(misses=1)
+        return None
+
+    def get_many(self, keys):
+        self.stats.add(misses=len(keys))
+        return {}
+
+    def set(self, key, value, ttl=None):
+        pass
+
+    def set_many(self, mapping, ttl=None):
+        pass
+
+    def delete(self, *keys):
+        pass
+
+    def clear(self):
+        pass
+
+    def info(self):
+        return dict(self.stats.as_dict(), backend=self.backend)
+
+
+def create_cache(config):
+    backend = config.get('CACHE_BACKEND', 'memory')
+    ttl = config.get('CACHE_DEFAULT_TTL', 30)
+    if backend == 'memory':
+        return MemoryCache(config.get('CACHE_MAX_ENTRIES', 10000), ttl)
+    if backend == 'redis':
+        return RedisCache(config.get('CACHE_REDIS_URL', 'redis://localhost:6379/0'), ttl)
+    if backend == 'null':
+        return NullCache()
+    raise ValueError(f"CACHE_BACKEND desconhecido: {backend!r}")
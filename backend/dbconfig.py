@@ -0,0 +1,148 @@
+# brasfut-app/backend/dbconfig.py
+
+"""Perfil de engine do banco: pragmas do SQLite, pools e leitura separada.
+
+Com DB_PROFILE = 'production' (padrão) toda conexão SQLite abre com WAL,
+synchronous=NORMAL, cache/mmap maiores, temp_store em memória e
+busy_timeout, o que deixa leitores e o escritor trabalharem ao mesmo tempo
+e troca o "database is locked" imediato por uma espera limitada.
+DB_PROFILE = 'default' mantém as configurações do SQLite intactas.
+
+Com DB_READ_POOL ligado, os SELECTs vão para um pool só de leitura
+(bind 'read') e as escritas para um único escritor que abre as transações
+com BEGIN IMMEDIATE: as threads fazem fila no pool do escritor em vez de
+disputarem o lock do arquivo. Trocar SQLALCHEMY_DATABASE_URI para um
+PostgreSQL usa os mesmos modelos; aí os pragmas não se aplicam e
+DATABASE_READ_URL pode apontar para uma réplica.
+
+O SQLite só aplica chaves estrangeiras (e o ON DELETE CASCADE) com PRAGMA
+foreign_keys, ligado no escritor quando DB_CASCADE_DELETES está ativo.
+"""
+
+from functools import partial
+
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.sql import Select
+
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -64000,        # em KiB (negativo): ~64 MB por conexão
+    'mmap_size': 268435456,      # 256 MB
+    'temp_store': 'MEMORY',
+}
+
+
+def _is_sqlite(url):
+    return url.startswith('sqlite')
+
+
+def _is_memory_sqlite(url):
+    # Mesmo critério do Flask-SQLAlchemy, que usa StaticPool nesses casos
+    return _is_sqlite(url) and make_url(url).database in (None, '', ':memory:')
+
+
+def _sqlite_read_only_url(url):
+    path = url[len('sqlite:///'):]
+    return f'sqlite:///file:{path}?mode=ro&uri=true'
+
+
+def engine_options(config, url, pool_size):
+    if _is_memory_sqlite(url):
+        # Uma conexão só (StaticPool), que não aceita as opções de pool
+        return {'connect_args': {'timeout': config['DB_BUSY_TIMEOUT_MS'] / 1000}}
+    if _is_sqlite(url):
+        return {
+            'pool_size': pool_size,
+            'max_overflow': 0,
+            'pool_timeout': 30,
+            'connect_args': {'timeout': config['DB_BUSY_TIMEOUT_MS'] / 1000},
+        }
+    return {
+        'pool_size': pool_size,
+        'max_overflow': pool_size,
+        'pool_pre_ping': True,
+        'pool_recycle': 1800,
+    }
+
+
+def apply_engine_profile(config):
+    """Preenche SQLALCHEMY_ENGINE_OPTIONS/BINDS a partir das chaves DB_*."""
+    url = config['SQLALCHEMY_DATABASE_URI']
+    pool_size = config['DB_POOL_SIZE']
+    # Um banco em memória só existe na própria conexão: sem pool de leitura
+    if not config['DB_READ_POOL'] or _is_memory_sqlite(url):
+        config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(config, url, pool_size)
+        return
+
+    read_url = config.get('DATABASE_READ_URL') or (
+        _sqlite_read_only_url(url) if _is_sqlite(url) else url)
+    # Um único escritor por processo; os leitores ficam com o pool inteiro
+    config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(config, url, 1)
+    config['SQLALCHEMY_BINDS'] = {
+        'read': dict(engine_options(config, read_url, pool_size), url=read_url),
+    }
+
+
+def _set_pragmas(pragmas, dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for name, value in pragmas.items():
+        cursor.execute(f'PRAGMA {name}={value}')
+    cursor.close()
+
+
+def _manual_begin(dbapi_connection, connection_record):
+    # Desliga o BEGIN implícito do pysqlite para emitirmos o nosso
+    dbapi_connection.isolation_level = None
+
+
+def _begin_immediate(connection):
+    connection.exec_driver_sql('BEGIN IMMEDIATE')
+
+
+def install_engine_profile(engines, config):
+    """Registra os pragmas nas engines já criadas pelo Flask-SQLAlchemy.
+
+    Precisa rodar antes da primeira conexão de cada engine (e de novo em
+    cada processo, se as engines forem recriadas após um fork).
+    """
+    for key, engine in engines.items():
+        if engine.dialect.name != 'sqlite':
+            continue
+        if config['DB_PROFILE'] == 'production':
+            pragmas = dict(SQLITE_PRAGMAS, busy_timeout=config['DB_BUSY_TIMEOUT_MS'])
+            if key == 'read':
+                # journal_mode é persistente no arquivo e só o escritor o define
+                del pragmas['journal_mode']
+                pragmas['query_only'] = 'ON'
+            event.listen(engine, 'connect', partial(_set_pragmas, pragmas))
+        if key is None and config['DB_CASCADE_DELETES']:
+            event.listen(engine, 'connect', partial(_set_pragmas, {'foreign_keys': 'ON'}))
+        if key is None and 'read' in engines:
+            event.listen(engine, 'connect', _manual_begin)
+            event.listen(engine, 'begin', _begin_immediate)
+
+
+class RoutingSession(Session):
+    """Sessão que manda SELECTs ao bind 'read' quando ele existe.
+
+    Depois da primeira escrita (flush ou DML) a transação fica presa ao
+    escritor até o commit/rollback, para que leituras seguintes vejam o
+    que ela acabou de gravar.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        engines = self._db.engines
+        if bind is None and 'read' in engines and not self.info.get('writing'):
+            if isinstance(clause, Select) and not self._flushing:
+                return engines['read']
+            self.info['writing'] = True
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@event.listens_for(RoutingSession, 'after_transaction_end')
+def _release_writer(session, transaction):
+    if transaction.parent is None:
+        session.info.pop('writing', None)
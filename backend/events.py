@@ -0,0 +1,303 @@
+# brasfut-app/backend/events.py
+
+"""Canal de eventos Server-Sent Events (/events): log no banco e hub por processo.
+
+As rotas de escrita gravam cada evento (post criado, like, comentário,
+post apagado) na tabela `event_log`, na mesma transação da escrita. Cada
+processo que serve /events roda um EventFeed que lê o log em ordem de id e
+entrega os eventos ao seu EventHub; assim todos os workers (e o
+events_server.py) veem as escritas de todos, e o id do log é o `id:` do
+SSE, o que faz o Last-Event-ID valer entre processos e restarts.
+
+Cada assinatura só recebe eventos dos autores que o usuário segue (mais os
+próprios) ou, sem usuário, todos. O hub indexa as assinaturas por autor,
+então entregar um evento custa O(assinantes interessados), e não O(conexões
+abertas). Mudanças de follow também passam pelo log (tipo interno
+`follow_changed`, não enviado aos clientes) para ajustar as assinaturas
+abertas em qualquer processo.
+
+Onde as conexões esperam depende de quem serve a rota:
+  * events_server.py (produção): um event loop asyncio segura milhares de
+    conexões ociosas numa única thread (AsyncSubscription);
+  * rota /events do app WSGI (desenvolvimento): cada conexão bloqueia uma
+    thread do servidor num `threading.Condition` até o próximo evento ou
+    heartbeat. EVENTS_MAX_SUBSCRIBERS limita quantas threads isso pode
+    ocupar por processo.
+"""
+
+import datetime
+import json
+import threading
+import time
+from collections import deque
+
+from sqlalchemy import Column, DateTime, Index, Integer, MetaData, String, Table, Text, delete, insert, select
+
+# Tipos que só ajustam as assinaturas e nunca vão para os clientes
+INTERNAL_TYPES = {'follow_changed'}
+
+metadata = MetaData()
+
+event_log = Table(
+    'event_log', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('type', String(30), nullable=False),
+    Column('author_id', Integer, nullable=False),
+    Column('data', Text, nullable=False),
+    Column('created_at', DateTime, nullable=False),
+    Index('ix_event_log_created_at', 'created_at'),
+    # Ids nunca reutilizados, mesmo depois da limpeza do fim do log
+    sqlite_autoincrement=True,
+)
+
+
+def _now():
+    # Sem fuso, como o SQLite devolve (ver jobs._now)
+    return datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+
+
+def create_tables(engine):
+    metadata.create_all(engine)
+
+
+def record(session, event_type, author_id, data):
+    """Grava o evento na transação corrente (sem commit)."""
+    session.execute(insert(event_log).values(
+        type=event_type, author_id=author_id, data=json.dumps(data), created_at=_now()))
+
+
+def _as_event(row):
+    # `data` segue como texto JSON: vai direto para a linha `data:` do SSE
+    return {"id": row.id, "type": row.type, "author_id": row.author_id, "data": row.data}
+
+
+def fetch_after(session, after_id, limit):
+    rows = session.execute(select(event_log).where(event_log.c.id > after_id)
+                           .order_by(event_log.c.id).limit(limit))
+    return [_as_event(row) for row in rows]
+
+
+def fetch_latest(session, limit):
+    rows = session.execute(select(event_log).order_by(event_log.c.id.desc()).limit(limit))
+    return [_as_event(row) for row in rows][::-1]
+
+
+def prune(session, retention_seconds):
+    cutoff = _now() - datetime.timedelta(seconds=retention_seconds)
+    return session.execute(delete(event_log).where(event_log.c.created_at < cutoff)).rowcount
+
+
+class HubFull(Exception):
+    pass
+
+
+class Subscription:
+    def __init__(self, hub, user_id, authors, max_queue):
+        self.hub = hub
+        self.user_id = user_id
+        self.authors = authors
+        self.events = deque(maxlen=max_queue)
+        self.dropped = 0
+        self._cond = threading.Condition()
+        self.closed = False
+
+    def push(self, event):
+        with self._cond:
+            if len(self.events) == self.events.maxlen:
+                # Cliente lento: descarta o mais antigo em vez de crescer sem limite
+                self.dropped += 1
+            self.events.append(event)
+            self._cond.notify()
+
+    def take(self):
+        """Devolve (e esvazia) os eventos pendentes sem bloquear."""
+        with self._cond:
+            pending = list(self.events)
+            self.events.clear()
+            return pending
+
+    def wait(self, timeout):
+        """Bloqueia até haver eventos (ou o timeout) e devolve os pendentes."""
+        with self._cond:
+            if not self.events and not self.closed:
+                self._cond.wait(timeout)
+        return self.take()
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify()
+        self.hub.unsubscribe(self)
+
+
+class EventHub:
+    def __init__(self, max_subscribers=10000, max_queue=256, history=1000):
+        self.max_subscribers = max_subscribers
+        self.max_queue = max_queue
+        self._lock = threading.Lock()
+        self._by_author = {}
+        self._global = set()
+        self._by_user = {}
+        self._all = set()
+        # Eventos recentes para reenviar após reconexão (Last-Event-ID)
+        self._history = deque(maxlen=history)
+        self.published = 0
+
+    def subscribe(self, user_id=None, authors=None, last_event_id=None,
+                  factory=Subscription):
+        """Abre uma assinatura; authors=None recebe os eventos de todos."""
+        subscription = factory(
+            self, user_id, set(authors) if authors is not None else None,
+            self.max_queue)
+        # Um cliente que volta com Last-Event-ID pode estar à frente do feed
+        # deste processo (o evento veio de outro); não reenvia o que ele já viu.
+        subscription.after = last_event_id or 0
+        with self._lock:
+            if len(self._all) >= self.max_subscribers:
+                raise HubFull()
+            self._all.add(subscription)
+            if subscription.authors is None:
+                self._global.add(subscription)
+            else:
+                for author_id in subscription.authors:
+                    self._by_author.setdefault(author_id, set()).add(subscription)
+            if user_id is not None:
+                self._by_user.setdefault(user_id, set()).add(subscription)
+            replay = [event for event in self._history
+                      if last_event_id is not None and event['id'] > last_event_id
+                      and self._wants(subscription, event['author_id'])]
+        for event in replay:
+            subscription.push(event)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            if subscription not in self._all:
+                return
+            self._all.discard(subscription)
+            self._global.discard(subscription)
+            for author_id in subscription.authors or ():
+                subscribers = self._by_author.get(author_id)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._by_author[author_id]
+            subscriptions = self._by_user.get(subscription.user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._by_user[subscription.user_id]
+
+    @staticmethod
+    def _wants(subscription, author_id):
+        return subscription.authors is None or author_id in subscription.authors
+
+    def remember(self, events):
+        """Põe eventos já entregues por outro processo no histórico de replay."""
+        with self._lock:
+            self._history.extend(event for event in events
+                                 if event['type'] not in INTERNAL_TYPES)
+
+    def dispatch(self, event):
+        """Entrega um evento lido do log às assinaturas interessadas."""
+        if event['type'] in INTERNAL_TYPES:
+            data = json.loads(event['data'])
+            self.follow_changed(data['follower_id'], data['followed_id'], data['following'])
+            return
+        with self._lock:
+            self._history.append(event)
+            targets = self._global | self._by_author.get(event['author_id'], set())
+            self.published += 1
+        for subscription in targets:
+            if event['id'] > subscription.after:
+                subscription.push(event)
+
+    def follow_changed(self, follower_id, followed_id, following):
+        """Atualiza o escopo das assinaturas abertas do seguidor."""
+        with self._lock:
+            for subscription in self._by_user.get(follower_id, ()):
+                if subscription.authors is None:
+                    continue
+                if following:
+                    subscription.authors.add(followed_id)
+                    self._by_author.setdefault(followed_id, set()).add(subscription)
+                elif followed_id != follower_id:
+                    subscription.authors.discard(followed_id)
+                    subscribers = self._by_author.get(followed_id)
+                    if subscribers:
+                        subscribers.discard(subscription)
+                        if not subscribers:
+                            del self._by_author[followed_id]
+
+    def close_all(self):
+        """Encerra todas as assinaturas (streams abertos saem do loop)."""
+        with self._lock:
+            subscriptions = list(self._all)
+        for subscription in subscriptions:
+            subscription.close()
+
+    def info(self):
+        with self._lock:
+            return {"subscribers": len(self._all), "max_subscribers": self.max_subscribers,
+                    "published": self.published, "authors_indexed": len(self._by_author)}
+
+
+class EventFeed:
+    """Lê o event_log em ordem de id e entrega os eventos novos ao hub.
+
+    `fetch(after_id, limit)` e `fetch_latest(limit)` fazem as consultas (e
+    podem rodar em outra thread); `deliver` só mexe no hub.
+
+    No SQLite os ids chegam ao log na ordem dos commits. No PostgreSQL uma
+    transação com id menor pode commitar depois de outra com id maior; uma
+    lacuna na sequência espera até `gap_grace` segundos pelo id que falta
+    antes de ser pulada (transação desfeita), para o evento não se perder.
+    """
+
+    def __init__(self, hub, fetch, fetch_latest, batch_size=500, gap_grace=2.0):
+        self.hub = hub
+        self.fetch = fetch
+        self.fetch_latest = fetch_latest
+        self.batch_size = batch_size
+        self.gap_grace = gap_grace
+        self.last_id = 0
+        self._gap_since = None
+
+    def bootstrap(self, history):
+        """Carrega o fim do log como histórico e passa a ler dali em diante."""
+        events = self.fetch_latest(history)
+        self.hub.remember(events)
+        if events:
+            self.last_id = events[-1]['id']
+
+    def fetch_new(self):
+        return self.fetch(self.last_id, self.batch_size)
+
+    def deliver(self, events):
+        for event in events:
+            if self.last_id and event['id'] != self.last_id + 1:
+                now = time.monotonic()
+                if self._gap_since is None:
+                    self._gap_since = now
+                if now - self._gap_since < self.gap_grace:
+                    return
+            self._gap_since = None
+            self.last_id = event['id']
+            self.hub.dispatch(event)
+
+    def poll(self):
+        self.deliver(self.fetch_new())
+
+    def run(self, stop, poll_seconds):
+        """Loop bloqueante (uma thread por processo WSGI)."""
+        while not stop.is_set():
+            try:
+                self.poll()
+            except Exception:
+                # Banco indisponível por um instante: tenta de novo no próximo ciclo
+                pass
+            stop.wait(poll_seconds)
+
+
+def format_sse(event):
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {event['data']}\n\n"
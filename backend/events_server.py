@@ -0,0 +1,288 @@
+# brasfut-app/backend/events_server.py
+
+"""Servidor do canal de eventos (/events) para milhares de conexões ociosas.
+
+    python events_server.py --bind 0.0.0.0:5001
+
+Um processo com um event loop asyncio: cada conexão SSE é só um socket e
+uma AsyncSubscription, sem thread própria, então conexões ociosas custam
+memória e não prendem os workers do serve.py. No proxy, encaminhe /events
+para cá e o resto da API para o serve.py.
+
+Os eventos vêm do event_log do banco (ver events.py), lido a cada
+EVENTS_POLL_SECONDS; as consultas (o log e os follows de quem conecta)
+rodam num pool pequeno de threads, fora do loop. Rotas:
+
+  GET /events[?user_id=N]   stream SSE, igual à rota do app (Last-Event-ID
+                            reenvia o que ainda estiver no histórico);
+  GET /healthz              200 com as estatísticas do hub.
+
+Um cliente que para de ler é desconectado depois de --write-timeout
+segundos com o buffer cheio; um que fecha a conexão é percebido na hora.
+"""
+
+import argparse
+import asyncio
+import importlib
+import json
+import logging
+import os
+import signal
+import socket
+import sys
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+from events import HubFull, format_sse
+
+logger = logging.getLogger('brasfut.events')
+
+HEADER_TIMEOUT = 10
+MAX_HEADER_BYTES = 16 * 1024
+
+STATUS = {200: 'OK', 204: 'No Content', 400: 'Bad Request', 404: 'Not Found',
+          405: 'Method Not Allowed', 503: 'Service Unavailable'}
+
+
+class AsyncSubscription:
+    """Assinatura do hub para o event loop (push e wait na mesma thread)."""
+
+    def __init__(self, hub, user_id, authors, max_queue):
+        self.hub = hub
+        self.user_id = user_id
+        self.authors = authors
+        self.events = deque(maxlen=max_queue)
+        self.dropped = 0
+        self.closed = False
+        self._ready = asyncio.Event()
+
+    def push(self, event):
+        if len(self.events) == self.events.maxlen:
+            self.dropped += 1
+        self.events.append(event)
+        self._ready.set()
+
+    def take(self):
+        pending = list(self.events)
+        self.events.clear()
+        return pending
+
+    async def wait(self, timeout):
+        if not self.events and not self.closed:
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        self._ready.clear()
+        return self.take()
+
+    def close(self):
+        self.closed = True
+        self._ready.set()
+        self.hub.unsubscribe(self)
+
+
+def _int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class EventServer:
+    def __init__(self, module, app, options):
+        self.module = module
+        self.app = app
+        self.options = options
+        self.hub = module.hub
+        self.feed = module.make_event_feed(app)
+        # Poucas threads bastam: só o poll do log e os follows de quem conecta
+        self.executor = ThreadPoolExecutor(max_workers=options.db_threads,
+                                           thread_name_prefix='brasfut-events-db')
+        self.connections = set()
+
+    async def run_db(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    def _follow_authors(self, user_id):
+        with self.app.app_context():
+            return self.module.follow_authors(user_id)
+
+    async def follow(self):
+        """Lê o event_log e entrega ao hub enquanto o servidor estiver de pé."""
+        poll = self.app.config['EVENTS_POLL_SECONDS']
+        while True:
+            try:
+                self.feed.deliver(await self.run_db(self.feed.fetch_new))
+            except Exception as e:
+                logger.warning("Falha ao ler o event_log: %s", e)
+            await asyncio.sleep(poll)
+
+    async def handle(self, reader, writer):
+        task = asyncio.current_task()
+        self.connections.add(task)
+        try:
+            await self._handle(reader, writer)
+        except (ConnectionError, asyncio.TimeoutError):
+            pass
+        finally:
+            self.connections.discard(task)
+            writer.close()
+
+    async def _handle(self, reader, writer):
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), HEADER_TIMEOUT)
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            return
+        request_line, *header_lines = head.decode('latin-1').split('\r\n')
+        try:
+            method, target, _ = request_line.split(' ', 2)
+        except ValueError:
+            return await self.respond(writer, 400, {"message": "Requisição inválida."})
+        headers = {}
+        for line in header_lines:
+            name, _, value = line.partition(':')
+            if name:
+                headers[name.strip().lower()] = value.strip()
+        url = urlsplit(target)
+        query = parse_qs(url.query)
+
+        if method == 'OPTIONS':
+            return await self.respond(writer, 204, None, {
+                'Access-Control-Allow-Methods': 'GET, OPTIONS',
+                'Access-Control-Allow-Headers': 'Last-Event-ID, Cache-Control'})
+        if url.path == '/healthz':
+            return await self.respond(writer, 200, {"status": "ok", **self.hub.info()})
+        if url.path != '/events':
+            return await self.respond(writer, 404, {"message": "Rota não encontrada."})
+        if method != 'GET':
+            return await self.respond(writer, 405, {"message": "Método não permitido."})
+        await self.stream(reader, writer, _int(query.get('user_id', [None])[0]),
+                          _int(headers.get('last-event-id')))
+
+    async def respond(self, writer, status, body, extra_headers=None):
+        payload = json.dumps(body).encode() if body is not None else b''
+        headers = {'Content-Type': 'application/json', 'Content-Length': str(len(payload)),
+                   'Access-Control-Allow-Origin': '*', 'Connection': 'close',
+                   **(extra_headers or {})}
+        writer.write(self._head(status, headers) + payload)
+        await asyncio.wait_for(writer.drain(), self.options.write_timeout)
+
+    @staticmethod
+    def _head(status, headers):
+        lines = [f'HTTP/1.1 {status} {STATUS[status]}']
+        lines += [f'{name}: {value}' for name, value in headers.items()]
+        return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+    async def stream(self, reader, writer, user_id, last_event_id):
+        # Mesma semântica da rota /events do app (ver app.stream_events)
+        authors = await self.run_db(self._follow_authors, user_id) if user_id else None
+        try:
+            subscription = self.hub.subscribe(user_id, authors, last_event_id,
+                                              factory=AsyncSubscription)
+        except HubFull:
+            return await self.respond(writer, 503, {
+                "message": "Muitas conexões abertas. Tente novamente em instantes."})
+
+        # O cliente não manda mais nada: ler algo (ou EOF) quer dizer que ele saiu
+        hangup = asyncio.ensure_future(reader.read(1))
+        hangup.add_done_callback(lambda _: subscription.close())
+        heartbeat = self.app.config['EVENTS_HEARTBEAT_SECONDS']
+        try:
+            writer.write(self._head(200, {
+                'Content-Type': 'text/event-stream', 'Cache-Control': 'no-cache',
+                'X-Accel-Buffering': 'no', 'Access-Control-Allow-Origin': '*',
+                'Connection': 'close'}) + b'retry: 3000\n\n')
+            while not subscription.closed:
+                await asyncio.wait_for(writer.drain(), self.options.write_timeout)
+                pending = await subscription.wait(heartbeat)
+                if subscription.closed:
+                    break
+                chunk = ''.join(format_sse(event) for event in pending) or ': ping\n\n'
+                writer.write(chunk.encode())
+        finally:
+            hangup.cancel()
+            subscription.close()
+
+    async def serve(self, listener, stop_signals):
+        loop = asyncio.get_running_loop()
+        stopping = asyncio.Event()
+        for signum in stop_signals:
+            loop.add_signal_handler(signum, stopping.set)
+
+        # Sem o histórico carregado, o primeiro poll mandaria o log inteiro
+        await self.run_db(self.feed.bootstrap, self.app.config['EVENTS_HISTORY'])
+        follower = asyncio.ensure_future(self.follow())
+        server = await asyncio.start_server(self.handle, sock=listener, limit=MAX_HEADER_BYTES)
+        logger.info("Servidor de eventos %d pronto (até %d conexões).", os.getpid(),
+                    self.hub.max_subscribers)
+        await stopping.wait()
+
+        server.close()
+        follower.cancel()
+        self.hub.close_all()
+        if self.connections:
+            await asyncio.wait(list(self.connections), timeout=5)
+        self.executor.shutdown(wait=False)
+
+
+def _raise_nofile_limit():
+    # Cada conexão é um descritor; o limite padrão (1024) viraria o teto
+    try:
+        import resource
+    except ImportError:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+def run(listener, options, stop_signals=(signal.SIGTERM, signal.SIGINT)):
+    """Sobe o servidor num socket já aberto (usado também pelo serve.py)."""
+    _raise_nofile_limit()
+    module = importlib.import_module(options.module)
+    app = module.create_app({'EVENTS_MAX_SUBSCRIBERS': options.max_connections})
+    asyncio.run(EventServer(module, app, options).serve(listener, stop_signals))
+    if hasattr(module, 'close_app'):
+        module.close_app(app)
+
+
+def bind(address, backlog):
+    host, _, port = address.rpartition(':')
+    family = socket.AF_INET6 if ':' in host else socket.AF_INET
+    listener = socket.socket(family, socket.SOCK_STREAM)
+    listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    listener.bind((host.strip('[]') or '0.0.0.0', int(port)))
+    listener.listen(backlog)
+    listener.setblocking(False)
+    return listener
+
+
+def parse_args(argv=None):
+    env = os.environ.get
+    parser = argparse.ArgumentParser(description='Servidor do canal de eventos (SSE) do Brasfut.')
+    parser.add_argument('--bind', default=env('BRASFUT_EVENTS_BIND', '127.0.0.1:5001'),
+                        help='host:porta (padrão: %(default)s)')
+    parser.add_argument('--backlog', type=int, default=2048)
+    parser.add_argument('--module', default='app', help='módulo com create_app()')
+    parser.add_argument('--max-connections', type=int,
+                        default=int(env('BRASFUT_EVENTS_MAX_CONNECTIONS', 10000)),
+                        help='conexões /events simultâneas (padrão: %(default)s)')
+    parser.add_argument('--write-timeout', type=float, default=30,
+                        help='segundos com o buffer cheio antes de desconectar um cliente lento')
+    parser.add_argument('--db-threads', type=int, default=4,
+                        help='threads para as consultas ao banco')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    options = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='[%(asctime)s] %(process)d %(levelname)s %(message)s')
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    run(bind(options.bind, options.backlog), options)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,340 @@
+# brasfut-app/backend/jobs.py
+
+"""Fila de jobs durável no próprio banco (padrão outbox).
+
+As rotas de escrita gravam a linha principal (post, comentário, follow) e
+um job na tabela `jobs` na mesma transação e respondem em seguida; os
+efeitos colaterais (fan-out, índice de busca, tags) rodam depois, em um
+pool de processos worker (`flask run-jobs`). Como o job nasce no mesmo
+commit do dado, nenhum efeito se perde se o processo cair logo depois da
+resposta.
+
+Cada worker reivindica um lote de jobs com um UPDATE ... RETURNING (no
+PostgreSQL com FOR UPDATE SKIP LOCKED) que grava um token de posse e um
+prazo (lease). O handler roda na mesma transação que marca o job como
+concluído, e a conclusão só vale se o token ainda for o do worker: se o
+lease venceu e outro worker pegou o job, a transação inteira é desfeita.
+Assim cada job tem efeito exatamente uma vez no banco, mesmo com retries.
+
+Falhas voltam para a fila com backoff exponencial (com jitter); depois de
+JOBS_MAX_ATTEMPTS tentativas o job vai para `dead_jobs` com o último erro.
+A chave de idempotência é única: enfileirar de novo um job com a mesma
+chave, enquanto ele ainda está em `jobs`, não cria outro. Jobs concluídos
+ficam JOBS_RETENTION_SECONDS na tabela para as estatísticas de latência.
+"""
+
+import datetime
+import json
+import logging
+import multiprocessing
+import os
+import random
+import signal
+import time
+import uuid
+
+from sqlalchemy import (Column, DateTime, Index, Integer, MetaData, String, Table, Text, and_,
+                        delete, func, insert, literal, or_, select, update)
+
+logger = logging.getLogger(__name__)
+
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+
+# Quantos jobs concluídos recentes entram no cálculo dos percentis
+STATS_SAMPLE = 5000
+
+metadata = MetaData()
+
+jobs = Table(
+    'jobs', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('kind', String(50), nullable=False),
+    Column('payload', Text, nullable=False),
+    Column('idempotency_key', String(200), unique=True),
+    Column('status', String(10), nullable=False),
+    Column('attempts', Integer, nullable=False, default=0),
+    Column('run_at', DateTime, nullable=False),
+    Column('enqueued_at', DateTime, nullable=False),
+    Column('started_at', DateTime),
+    Column('finished_at', DateTime),
+    Column('locked_by', String(50)),
+    Column('locked_until', DateTime),
+    Column('last_error', Text),
+    Index('ix_jobs_status_run_at', 'status', 'run_at'),
+)
+
+dead_jobs = Table(
+    'dead_jobs', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('kind', String(50), nullable=False),
+    Column('payload', Text, nullable=False),
+    Column('idempotency_key', String(200)),
+    Column('attempts', Integer, nullable=False),
+    Column('enqueued_at', DateTime, nullable=False),
+    Column('failed_at', DateTime, nullable=False),
+    Column('last_error', Text),
+)
+
+
+def _now():
+    # Sem fuso, como o SQLite devolve: as diferenças entre colunas lidas e
+    # este relógio não misturam datetimes com e sem tzinfo.
+    return datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+
+
+def create_tables(engine):
+    metadata.create_all(engine)
+
+
+def _insert_ignoring_key(dialect_name):
+    if dialect_name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    return dialect_insert(jobs).on_conflict_do_nothing(index_elements=['idempotency_key'])
+
+
+def enqueue(session, kind, payload, key=None, delay=0):
+    """Grava o job na transação corrente (sem commit)."""
+    now = _now()
+    values = {"kind": kind, "payload": json.dumps(payload), "idempotency_key": key,
+              "status": PENDING, "attempts": 0, "enqueued_at": now,
+              "run_at": now + datetime.timedelta(seconds=delay)}
+    statement = (_insert_ignoring_key(session.get_bind().dialect.name) if key
+                 else insert(jobs))
+    session.execute(statement.values(**values))
+
+
+def claim(session, batch_size, lease_seconds):
+    """Reivindica até batch_size jobs prontos e devolve (token, linhas).
+
+    Entram os pendentes cujo run_at já passou e os em execução cujo lease
+    venceu (worker que morreu no meio do job).
+    """
+    now = _now()
+    token = f"{os.getpid()}:{uuid.uuid4().hex[:12]}"
+    ready = select(jobs.c.id).where(or_(
+        and_(jobs.c.status == PENDING, jobs.c.run_at <= now),
+        and_(jobs.c.status == RUNNING, jobs.c.locked_until < now),
+    )).order_by(jobs.c.run_at, jobs.c.id).limit(batch_size).with_for_update(skip_locked=True)
+    rows = session.execute(
+        update(jobs).where(jobs.c.id.in_(ready)).values(
+            status=RUNNING, attempts=jobs.c.attempts + 1, started_at=now, locked_by=token,
+            locked_until=now + datetime.timedelta(seconds=lease_seconds))
+        .returning(jobs.c.id, jobs.c.kind, jobs.c.payload, jobs.c.attempts)).all()
+    session.commit()
+    return token, sorted(rows, key=lambda row: row.id)
+
+
+def complete(session, job_id, token):
+    """Marca o job como concluído; falso se o worker perdeu a posse dele."""
+    result = session.execute(update(jobs).where(
+        jobs.c.id == job_id, jobs.c.locked_by == token).values(
+        status=DONE, finished_at=_now(), locked_by=None, locked_until=None))
+    return result.rowcount == 1
+
+
+def backoff_seconds(attempts, base, maximum):
+    delay = min(base * 2 ** (attempts - 1), maximum)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def fail(session, job, token, error, max_attempts, backoff_base, backoff_max):
+    """Reagenda o job com backoff ou, esgotadas as tentativas, move para dead_jobs."""
+    owned = and_(jobs.c.id == job.id, jobs.c.locked_by == token)
+    if job.attempts < max_attempts:
+        delay = backoff_seconds(job.attempts, backoff_base, backoff_max)
+        session.execute(update(jobs).where(owned).values(
+            status=PENDING, run_at=_now() + datetime.timedelta(seconds=delay),
+            locked_by=None, locked_until=None, last_error=error))
+        return False
+    session.execute(insert(dead_jobs).from_select(
+        ['kind', 'payload', 'idempotency_key', 'attempts', 'enqueued_at', 'failed_at',
+         'last_error'],
+        select(jobs.c.kind, jobs.c.payload, jobs.c.idempotency_key, jobs.c.attempts,
+               jobs.c.enqueued_at, literal(_now(), DateTime), literal(error, Text))
+        .where(owned)))
+    session.execute(delete(jobs).where(owned))
+    return True
+
+
+def requeue_dead(session, dead_ids=None):
+    """Devolve jobs de dead_jobs para a fila, com as tentativas zeradas."""
+    query = select(dead_jobs)
+    if dead_ids:
+        query = query.where(dead_jobs.c.id.in_(dead_ids))
+    rows = session.execute(query).all()
+    now = _now()
+    for row in rows:
+        statement = (_insert_ignoring_key(session.get_bind().dialect.name)
+                     if row.idempotency_key else insert(jobs))
+        session.execute(statement.values(
+            kind=row.kind, payload=row.payload, idempotency_key=row.idempotency_key,
+            status=PENDING, attempts=0, run_at=now, enqueued_at=now))
+    if rows:
+        session.execute(delete(dead_jobs).where(dead_jobs.c.id.in_([row.id for row in rows])))
+    session.commit()
+    return len(rows)
+
+
+def prune_done(session, retention_seconds):
+    cutoff = _now() - datetime.timedelta(seconds=retention_seconds)
+    deleted = session.execute(delete(jobs).where(
+        jobs.c.status == DONE, jobs.c.finished_at < cutoff)).rowcount
+    session.commit()
+    return deleted
+
+
+def _percentiles(values):
+    if not values:
+        return {"p50": None, "p95": None, "max": None}
+    values.sort()
+    pick = lambda q: round(values[min(int(q * len(values)), len(values) - 1)], 4)
+    return {"p50": pick(0.5), "p95": pick(0.95), "max": round(values[-1], 4)}
+
+
+def stats(session, window_seconds):
+    """Profundidade da fila e latência dos jobs concluídos na janela."""
+    now = _now()
+    by_status = dict(session.execute(
+        select(jobs.c.status, func.count()).group_by(jobs.c.status)).all())
+    oldest_ready = session.execute(select(func.min(jobs.c.run_at)).where(
+        jobs.c.status == PENDING, jobs.c.run_at <= now)).scalar()
+    pending_by_kind = dict(session.execute(
+        select(jobs.c.kind, func.count()).where(jobs.c.status == PENDING)
+        .group_by(jobs.c.kind)).all())
+    recent = session.execute(
+        select(jobs.c.enqueued_at, jobs.c.started_at, jobs.c.finished_at).where(
+            jobs.c.status == DONE,
+            jobs.c.finished_at >= now - datetime.timedelta(seconds=window_seconds))
+        .order_by(jobs.c.finished_at.desc()).limit(STATS_SAMPLE)).all()
+    return {
+        "pending": by_status.get(PENDING, 0),
+        "running": by_status.get(RUNNING, 0),
+        "done": by_status.get(DONE, 0),
+        "dead": session.execute(select(func.count()).select_from(dead_jobs)).scalar(),
+        "pending_by_kind": pending_by_kind,
+        "oldest_ready_seconds": round((now - oldest_ready).total_seconds(), 3)
+        if oldest_ready else 0.0,
+        "window_seconds": window_seconds,
+        "completed_in_window": len(recent),
+        # Espera na fila (do enqueue até o início da tentativa que deu certo,
+        # incluindo backoffs) e duração dessa tentativa.
+        "queue_seconds": _percentiles(
+            [(row.started_at - row.enqueued_at).total_seconds() for row in recent]),
+        "run_seconds": _percentiles(
+            [(row.finished_at - row.started_at).total_seconds() for row in recent]),
+    }
+
+
+class Worker:
+    """Consome a fila em loop; um por processo do pool.
+
+    `maintenance` (opcional) roda a cada minuto, junto com a limpeza dos
+    jobs concluídos, para as limpezas periódicas do app.
+    """
+
+    def __init__(self, session, handlers, config, maintenance=None):
+        self.session = session
+        self.handlers = handlers
+        self.maintenance = maintenance
+        self.batch_size = config['JOBS_BATCH_SIZE']
+        self.lease_seconds = config['JOBS_LEASE_SECONDS']
+        self.poll_seconds = config['JOBS_POLL_SECONDS']
+        self.max_attempts = config['JOBS_MAX_ATTEMPTS']
+        self.backoff_base = config['JOBS_BACKOFF_SECONDS']
+        self.backoff_max = config['JOBS_BACKOFF_MAX_SECONDS']
+        self.retention_seconds = config['JOBS_RETENTION_SECONDS']
+        self._next_prune = 0.0
+
+    def run_once(self):
+        """Processa um lote; devolve quantos jobs foram reivindicados."""
+        token, claimed = claim(self.session, self.batch_size, self.lease_seconds)
+        for job in claimed:
+            self._execute(job, token)
+        return len(claimed)
+
+    def run(self, stop):
+        while not stop.is_set():
+            if time.monotonic() >= self._next_prune:
+                self._housekeeping()
+                self._next_prune = time.monotonic() + 60
+            if not self.run_once():
+                stop.wait(self.poll_seconds)
+
+    def _housekeeping(self):
+        prune_done(self.session, self.retention_seconds)
+        if self.maintenance is not None:
+            try:
+                self.maintenance()
+            except Exception as e:
+                self.session.rollback()
+                logger.warning("Manutenção periódica falhou: %s", e)
+
+    def _execute(self, job, token):
+        try:
+            handler = self.handlers.get(job.kind)
+            if handler is None:
+                raise LookupError(f"tipo de job desconhecido: {job.kind}")
+            if job.attempts > self.max_attempts:
+                # Reivindicado de novo depois de derrubar o worker várias vezes
+                raise RuntimeError("tentativas esgotadas (lease vencido)")
+            handler(**json.loads(job.payload))
+            if complete(self.session, job.id, token):
+                self.session.commit()
+            else:
+                logger.warning("Job %d (%s) perdeu o lease; efeitos desfeitos.", job.id, job.kind)
+                self.session.rollback()
+        except Exception as e:
+            self.session.rollback()
+            dead = fail(self.session, job, token, f"{type(e).__name__}: {e}",
+                        self.max_attempts, self.backoff_base, self.backoff_max)
+            self.session.commit()
+            log = logger.error if dead else logger.warning
+            log("Job %d (%s) falhou na tentativa %d%s: %s", job.id, job.kind, job.attempts,
+                " e foi para dead_jobs" if dead else "", e)
+
+
+def _child_main(target, stop):
+    # Ctrl+C chega ao grupo de processos inteiro; os filhos esperam o pai
+    # sinalizar `stop` e terminam o job em andamento em vez de abortá-lo.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    target(stop)
+
+
+def run_pool(target, processes, log=print):
+    """Roda target(stop) em `processes` processos até SIGINT/SIGTERM.
+
+    Processos que morrem sem o pool estar parando são recriados.
+    """
+    stop = multiprocessing.Event()
+
+    def spawn(index):
+        process = multiprocessing.Process(target=_child_main, args=(target, stop),
+                                          name=f'brasfut-jobs-{index}')
+        process.start()
+        return process
+
+    def shutdown(signum, frame):
+        stop.set()
+
+    previous = {sig: signal.signal(sig, shutdown) for sig in (signal.SIGINT, signal.SIGTERM)}
+    children = [spawn(index) for index in range(processes)]
+    log(f"{processes} worker(s) de jobs rodando (pid {os.getpid()}).")
+    try:
+        while not stop.is_set():
+            for index, process in enumerate(children):
+                process.join(timeout=0.5 / processes)
+                if not process.is_alive() and not stop.is_set():
+                    log(f"Worker {process.name} saiu com código {process.exitcode}; recriando.")
+                    children[index] = spawn(index)
+    finally:
+        stop.set()
+        for process in children:
+            process.join()
+        for sig, handler in previous.items():
+            signal.signal(sig, handler)
+    log("Workers de jobs encerrados.")
@@ -0,0 +1,224 @@
+# brasfut-app/backend/metrics.py
+
+"""Instrumentação opcional por requisição e endpoint /metrics (Prometheus).
+
+Com METRICS_ENABLED ligado, cada requisição conta e cronometra os
+statements SQL que executa, mede fases nomeadas (hash de senha,
+serialização JSON) e alimenta histogramas de latência por rota. Um mesmo
+statement repetido METRICS_N_PLUS_ONE_THRESHOLD vezes na mesma requisição
+é marcado como suspeita de N+1 (log de aviso + contador por rota).
+
+Desligado, nada é registrado: não há listeners nas engines nem hooks de
+requisição, e `timed()` devolve um context manager vazio.
+
+As métricas são por processo; com vários workers cada um expõe as suas.
+
+Respostas em streaming só são medidas até o app devolver a resposta: o que
+o gerador do corpo executa depois (ex.: /events) não entra na contagem, e
+por isso elas não recebem X-Query-Count nem Server-Timing.
+"""
+
+import bisect
+import contextlib
+import logging
+import threading
+import time
+from collections import Counter
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+
+_NOOP = contextlib.nullcontext()
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def render(self, name, labels):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{_labels(labels, le=bound)} {cumulative}')
+        lines.append(f'{name}_bucket{_labels(labels, le="+Inf")} {self.count}')
+        lines.append(f'{name}_sum{_labels(labels)} {self.total:.6f}')
+        lines.append(f'{name}_count{_labels(labels)} {self.count}')
+        return lines
+
+
+def _labels(labels, **extra):
+    items = list(labels.items()) + list(extra.items())
+    if not items:
+        return ''
+    return '{' + ','.join(f'{key}="{value}"' for key, value in items) + '}'
+
+
+class _TimedDumps:
+    """Mixin que soma o tempo de serialização do provider na fase 'json'."""
+
+    def dumps(self, obj, **kwargs):
+        started = time.perf_counter()
+        try:
+            return super().dumps(obj, **kwargs)
+        finally:
+            _add_phase('json', time.perf_counter() - started)
+
+
+def timed_json_provider(app):
+    """Versão cronometrada do provider JSON já instalado no app."""
+    provider_class = type(app.json)
+    return type('Timed' + provider_class.__name__, (_TimedDumps, provider_class), {})(app)
+
+
+def _add_phase(name, elapsed):
+    if has_request_context() and 'metrics_phases' in g:
+        g.metrics_phases[name] = g.metrics_phases.get(name, 0.0) + elapsed
+
+
+class Metrics:
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._latency = {}
+        self._queries = {}
+        self._requests = Counter()
+        self._sql_seconds = Counter()
+        self._n_plus_one = Counter()
+        self._slow_queries = Counter()
+        self._collectors = []
+
+    def init_app(self, app, engines):
+        if not app.config.get('METRICS_ENABLED'):
+            return
+        self.enabled = True
+        self.n_plus_one_threshold = app.config['METRICS_N_PLUS_ONE_THRESHOLD']
+        self.slow_query_seconds = app.config['METRICS_SLOW_QUERY_MS'] / 1000
+        self.debug_headers = app.config.get('METRICS_DEBUG_HEADERS', False)
+        for engine in engines:
+            event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+            event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+        app.json = timed_json_provider(app)
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+
+    def add_collector(self, collect):
+        """Registra uma função que devolve linhas extras para /metrics."""
+        self._collectors.append(collect)
+
+    def timed(self, phase):
+        """Context manager que soma a duração do bloco à fase informada."""
+        if not self.enabled:
+            return _NOOP
+        return self._timed(phase)
+
+    @contextlib.contextmanager
+    def _timed(self, phase):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            _add_phase(phase, time.perf_counter() - started)
+
+    # Hooks do SQLAlchemy
+
+    # O início fica no contexto da execução, e não em conn.info: um
+    # statement que falha não chega ao after_cursor_execute e não deixa
+    # resto na conexão.
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context.metrics_started = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, 'metrics_started', None)
+        if started is None or not has_request_context() or 'metrics_statements' not in g:
+            return
+        elapsed = time.perf_counter() - started
+        g.metrics_statements[statement] += 1
+        g.metrics_phases['db'] += elapsed
+        if elapsed >= self.slow_query_seconds:
+            logger.warning("Consulta lenta (%.1f ms) em %s: %s",
+                           elapsed * 1000, request.endpoint, statement)
+            with self._lock:
+                self._slow_queries[request.endpoint] += 1
+
+    # Hooks do Flask
+
+    def _before_request(self):
+        g.metrics_started = time.perf_counter()
+        g.metrics_statements = Counter()
+        g.metrics_phases = {'db': 0.0}
+
+    def _after_request(self, response):
+        if 'metrics_started' not in g:
+            return response
+        elapsed = time.perf_counter() - g.metrics_started
+        endpoint = request.endpoint or 'not_found'
+        query_count = sum(g.metrics_statements.values())
+        repeated = [(statement, count) for statement, count in g.metrics_statements.items()
+                    if count >= self.n_plus_one_threshold]
+        for statement, count in repeated:
+            logger.warning("Possível N+1 em %s: statement executado %d vezes: %s",
+                           endpoint, count, statement)
+
+        with self._lock:
+            key = (endpoint, request.method)
+            self._latency.setdefault(key, Histogram(LATENCY_BUCKETS)).observe(elapsed)
+            self._queries.setdefault(key, Histogram(QUERY_COUNT_BUCKETS)).observe(query_count)
+            self._requests[key + (response.status_code,)] += 1
+            self._sql_seconds[key] += g.metrics_phases['db']
+            if repeated:
+                self._n_plus_one[endpoint] += 1
+
+        # app.run(debug=True) liga o debug depois do init_app, daí a checagem aqui
+        if (self.debug_headers or current_app.debug) and not response.is_streamed:
+            response.headers['X-Query-Count'] = str(query_count)
+            timings = [f'{name};dur={seconds * 1000:.2f}'
+                       for name, seconds in g.metrics_phases.items()]
+            timings.append(f'total;dur={elapsed * 1000:.2f}')
+            response.headers['Server-Timing'] = ', '.join(timings)
+        return response
+
+    # Exposição
+
+    def render(self):
+        lines = []
+        with self._lock:
+            lines.append('# TYPE brasfut_http_requests_total counter')
+            for (endpoint, method, status), count in sorted(self._requests.items()):
+                lines.append('brasfut_http_requests_total' + _labels(
+                    {'endpoint': endpoint, 'method': method, 'status': status}) + f' {count}')
+            lines.append('# TYPE brasfut_http_request_duration_seconds histogram')
+            for (endpoint, method), histogram in sorted(self._latency.items()):
+                lines.extend(histogram.render('brasfut_http_request_duration_seconds',
+                                              {'endpoint': endpoint, 'method': method}))
+            lines.append('# TYPE brasfut_sql_queries_per_request histogram')
+            for (endpoint, method), histogram in sorted(self._queries.items()):
+                lines.extend(histogram.render('brasfut_sql_queries_per_request',
+                                              {'endpoint': endpoint, 'method': method}))
+            lines.append('# TYPE brasfut_sql_seconds_total counter')
+            for (endpoint, method), seconds in sorted(self._sql_seconds.items()):
+                lines.append('brasfut_sql_seconds_total' + _labels(
+                    {'endpoint': endpoint, 'method': method}) + f' {seconds:.6f}')
+            lines.append('# TYPE brasfut_sql_n_plus_one_total counter')
+            for endpoint, count in sorted(self._n_plus_one.items()):
+                lines.append(f'brasfut_sql_n_plus_one_total{_labels({"endpoint": endpoint})} {count}')
+            lines.append('# TYPE brasfut_sql_slow_queries_total counter')
+            for endpoint, count in sorted(self._slow_queries.items()):
+                lines.append(f'brasfut_sql_slow_queries_total{_labels({"endpoint": endpoint})} {count}')
+        for collect in self._collectors:
+            lines.extend(collect())
+        return '\n'.join(lines) + '\n'
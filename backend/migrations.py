@@ -0,0 +1,136 @@
+# brasfut-app/backend/migrations.py
+
+"""Executor de migrações de schema versionadas.
+
+As migrações são uma lista ordenada de (versão, nome, função) definida em
+app.py; as já aplicadas ficam registradas na tabela `schema_migrations`.
+Cada função deve ser idempotente (checar o schema antes de alterar), pois
+bancos criados antes deste mecanismo começam da versão 0 e podem já ter
+parte das mudanças.
+"""
+
+import datetime
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect
+from sqlalchemy.schema import AddConstraint, CreateColumn, CreateTable
+
+schema_migrations = Table(
+    'schema_migrations', MetaData(),
+    Column('version', Integer, primary_key=True),
+    Column('name', String(100), nullable=False),
+    Column('applied_at', DateTime, nullable=False),
+)
+
+
+def applied_versions(db):
+    schema_migrations.create(db.engine, checkfirst=True)
+    with db.engine.connect() as connection:
+        return {version for (version,) in connection.execute(
+            schema_migrations.select().with_only_columns(schema_migrations.c.version))}
+
+
+def upgrade(db, migrations, log=print):
+    """Aplica, em ordem, as migrações ainda não registradas."""
+    done = applied_versions(db)
+    applied = []
+    for version, name, migrate in migrations:
+        if version in done:
+            continue
+        log(f"Aplicando migração {version:04d}_{name}...")
+        migrate()
+        db.session.execute(schema_migrations.insert().values(
+            version=version, name=name,
+            applied_at=datetime.datetime.now(datetime.timezone.utc)))
+        db.session.commit()
+        applied.append(version)
+    return applied
+
+
+def pending_versions(connection, migrations):
+    """Versões ainda não aplicadas, só com leituras na conexão dada (seguro para o /readyz)."""
+    if not inspect(connection).has_table('schema_migrations'):
+        return [version for version, _, _ in migrations]
+    done = {version for (version,) in connection.execute(
+        schema_migrations.select().with_only_columns(schema_migrations.c.version))}
+    return [version for version, _, _ in migrations if version not in done]
+
+
+def status(db, migrations):
+    done = applied_versions(db)
+    return [(version, name, version in done) for version, name, _ in migrations]
+
+
+def rebuild_sqlite_table(db, table):
+    """Recria uma tabela SQLite com a definição atual do modelo.
+
+    O SQLite não tem ALTER TABLE ... DROP CONSTRAINT; a saída documentada é
+    criar a tabela nova, copiar os dados, apagar a antiga e renomear. Os
+    índices (nomes globais no SQLite) só são criados depois do rename.
+    """
+    metadata = MetaData()
+    for other in db.metadata.sorted_tables:
+        if other is not table:
+            other.to_metadata(metadata)
+    new_table = table.to_metadata(metadata, name=table.name + '__new')
+    connection = db.session.connection()
+
+    connection.execute(CreateTable(new_table))
+    db.session.execute(new_table.insert().from_select(
+        [column.name for column in table.columns], table.select()))
+    connection.exec_driver_sql(f'DROP TABLE "{table.name}"')
+    connection.exec_driver_sql(f'ALTER TABLE "{new_table.name}" RENAME TO "{table.name}"')
+    for index in table.indexes:
+        index.create(connection)
+
+
+def drop_unique_constraint(db, table, name):
+    """Remove uma UniqueConstraint que não existe mais no modelo."""
+    existing = {constraint['name'] for constraint in
+                inspect(db.session.connection()).get_unique_constraints(table.name)}
+    if name not in existing:
+        return
+    if db.session.connection().dialect.name == 'sqlite':
+        rebuild_sqlite_table(db, table)
+    else:
+        db.session.connection().exec_driver_sql(
+            f'ALTER TABLE "{table.name}" DROP CONSTRAINT "{name}"')
+
+
+def add_missing_columns(db, table):
+    """Adiciona as colunas do modelo que ainda não existem (anuláveis ou com default)."""
+    connection = db.session.connection()
+    existing = {column['name'] for column in inspect(connection).get_columns(table.name)}
+    for column in table.columns:
+        if column.name not in existing:
+            ddl = CreateColumn(column).compile(dialect=connection.dialect)
+            connection.exec_driver_sql(f'ALTER TABLE "{table.name}" ADD COLUMN {ddl}')
+
+
+def update_foreign_keys(db, table):
+    """Recria as chaves estrangeiras cujo ON DELETE difere do modelo."""
+    connection = db.session.connection()
+    existing = {tuple(fk['constrained_columns']): fk
+                for fk in inspect(connection).get_foreign_keys(table.name)}
+    changed = []
+    for constraint in table.foreign_key_constraints:
+        reflected = existing.get(tuple(constraint.column_keys))
+        if reflected is None:
+            continue
+        ondelete = reflected.get('options', {}).get('ondelete')
+        if (ondelete or '').upper() != (constraint.ondelete or '').upper():
+            changed.append((reflected['name'], constraint))
+    if not changed:
+        return
+    if connection.dialect.name == 'sqlite':
+        rebuild_sqlite_table(db, table)
+        return
+    for name, constraint in changed:
+        connection.exec_driver_sql(f'ALTER TABLE "{table.name}" DROP CONSTRAINT "{name}"')
+        connection.execute(AddConstraint(constraint))
+
+
+def create_missing_indexes(db, table):
+    existing = {index['name'] for index in inspect(db.session.connection()).get_indexes(table.name)}
+    for index in table.indexes:
+        if index.name not in existing:
+            index.create(db.session.connection())
@@ -0,0 +1,147 @@
+# brasfut-app/backend/passwords.py
+
+"""Hash de senhas fora da thread da requisição e limite de tentativas de login.
+
+generate_password_hash/check_password_hash (scrypt) gastam dezenas a
+centenas de ms de CPU segurando o GIL; rodando na thread da requisição,
+um pico de cadastros trava as leituras do feed no mesmo processo. Aqui o
+hash vai para um pool de processos limitado: a thread só espera o
+resultado (sem o GIL) e, com mais de PASSWORD_HASH_MAX_PENDING hashes na
+fila, a chamada falha na hora com HasherBusy, que as rotas viram 429.
+
+Os processos do pool saem de um forkserver, e não de um fork direto do
+worker HTTP: um fork de processo com várias threads pode herdar um lock
+tomado por outra thread e travar o filho. PASSWORD_HASH_WORKERS é por
+processo; o serve.py divide o padrão entre os workers HTTP.
+PASSWORD_HASH_WORKERS = 0 calcula o hash na própria thread (útil em
+desenvolvimento).
+
+O LoginThrottle guarda as tentativas em memória, por processo, como o
+MemoryCache; os limites valem por worker.
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+class HasherBusy(Exception):
+    pass
+
+
+class PasswordHasher:
+    def __init__(self, config):
+        # Método completo (com parâmetros), para comparar com o prefixo dos
+        # hashes gravados e decidir o rehash no login.
+        self.method = config['PASSWORD_HASH_METHOD']
+        self.workers = config['PASSWORD_HASH_WORKERS']
+        self.max_pending = config['PASSWORD_HASH_MAX_PENDING']
+        self.timeout = config['PASSWORD_HASH_TIMEOUT']
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self._pool = None
+        self._pool_pid = None
+        self.pending = 0
+        self.rejected = 0
+
+    def _executor(self):
+        # Criado sob demanda e recriado após um fork: um pool herdado do
+        # processo pai não tem mais processos filhos válidos.
+        with self._lock:
+            if self._pool is None or self._pool_pid != os.getpid():
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context('forkserver'))
+                self._pool_pid = os.getpid()
+            return self._pool
+
+    def _run(self, function, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise HasherBusy()
+        with self._lock:
+            self.pending += 1
+        try:
+            if not self.workers:
+                return function(*args)
+            return self._executor().submit(function, *args).result(self.timeout)
+        except TimeoutError:
+            raise HasherBusy()
+        finally:
+            with self._lock:
+                self.pending -= 1
+            self._slots.release()
+
+    def close(self):
+        with self._lock:
+            if self._pool is not None and self._pool_pid == os.getpid():
+                self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, password_hash, password):
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        return password_hash.split('$', 1)[0] != self.method
+
+    def info(self):
+        return {"workers": self.workers, "pending": self.pending,
+                "max_pending": self.max_pending, "rejected": self.rejected}
+
+
+class LoginThrottle:
+    """Janela deslizante de tentativas por chave ('ip:...', 'user:...')."""
+
+    def __init__(self, config):
+        self.config = config
+        self._lock = threading.Lock()
+        self._attempts = {}
+        self._last_sweep = time.monotonic()
+
+    def _limit(self, key):
+        if key.startswith('ip:'):
+            return self.config['LOGIN_MAX_ATTEMPTS_PER_IP']
+        return self.config['LOGIN_MAX_FAILURES_PER_USERNAME']
+
+    def retry_after(self, *keys):
+        """Segundos até a próxima tentativa permitida (0 = liberado)."""
+        window = self.config['LOGIN_THROTTLE_WINDOW']
+        now = time.monotonic()
+        wait = 0
+        with self._lock:
+            for key in keys:
+                limit = self._limit(key)
+                attempts = self._attempts.get(key)
+                if not limit or not attempts:
+                    continue
+                while attempts and attempts[0] <= now - window:
+                    attempts.popleft()
+                if len(attempts) >= limit:
+                    wait = max(wait, int(attempts[0] + window - now) + 1)
+        return wait
+
+    def hit(self, *keys):
+        window = self.config['LOGIN_THROTTLE_WINDOW']
+        now = time.monotonic()
+        with self._lock:
+            for key in keys:
+                if self._limit(key):
+                    self._attempts.setdefault(key, deque()).append(now)
+            if now - self._last_sweep > window:
+                # Descarta as chaves sem tentativas recentes
+                self._attempts = {key: attempts for key, attempts in self._attempts.items()
+                                  if attempts and attempts[-1] > now - window}
+                self._last_sweep = now
+
+    def reset(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._attempts.pop(key, None)
@@ -0,0 +1,157 @@
+# brasfut-app/backend/search.py
+
+"""Busca textual em posts e comentários com um índice FTS5 do SQLite.
+
+O índice `search_index` é uma tabela virtual FTS5 com o tokenizer
+unicode61 e remove_diacritics 2: "Tricolor", "tricolór" e "TRICOLOR" viram
+o mesmo termo, e "#Flamengo" é indexado como "flamengo". O FTS5 não tem
+stemmer para português, então cada termo da busca vira um prefixo ("gol"
+acha "gol", "gols" e "golaço"); todos os termos precisam aparecer.
+
+Cada post e cada comentário é uma linha do índice com o id do post; o
+rowid distingue os dois (post: 2*id, comentário: 2*id + 1) para que as
+rotas de escrita possam atualizar o índice direto pelo rowid. Os
+resultados agrupam por post e ordenam pelo melhor bm25 do post ou dos seus
+comentários.
+
+Só existe no SQLite; com outro banco `is_supported` é falso e a rota de
+busca responde 501.
+"""
+
+import base64
+import re
+
+from sqlalchemy import Column, Integer, MetaData, Text, Table, delete, func, insert, literal_column, select, true
+
+search_index = Table(
+    'search_index', MetaData(),
+    Column('rowid', Integer, primary_key=True),
+    Column('body', Text),
+    Column('post_id', Integer),
+)
+
+CREATE_INDEX_SQL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5("
+    "body, post_id UNINDEXED, tokenize = 'unicode61 remove_diacritics 2')")
+
+MAX_TERMS = 8
+# Teto de linhas casadas consideradas por busca: termos muito comuns não
+# fazem a consulta percorrer o índice inteiro.
+MAX_HITS = 5000
+_TERM = re.compile(r'\w+', re.UNICODE)
+
+
+def is_supported(connection):
+    return connection.dialect.name == 'sqlite'
+
+
+def create_index(connection):
+    connection.exec_driver_sql(CREATE_INDEX_SQL)
+
+
+def _post_rowid(post_id):
+    return post_id * 2
+
+
+def _comment_rowid(comment_id):
+    return comment_id * 2 + 1
+
+
+def _upsert():
+    # OR REPLACE: reindexar a mesma linha (job repetido) só a sobrescreve
+    return insert(search_index).prefix_with('OR REPLACE')
+
+
+def index_post(session, post_id, body):
+    session.execute(_upsert().values(
+        rowid=_post_rowid(post_id), body=body, post_id=post_id))
+
+
+def index_comment(session, comment_id, post_id, body):
+    session.execute(_upsert().values(
+        rowid=_comment_rowid(comment_id), body=body, post_id=post_id))
+
+
+def remove_post(session, post_id):
+    session.execute(delete(search_index).where(search_index.c.rowid == _post_rowid(post_id)))
+
+
+def remove_comments(session, comment_ids):
+    session.execute(delete(search_index).where(
+        search_index.c.rowid.in_([_comment_rowid(comment_id) for comment_id in comment_ids])))
+
+
+def remove_post_comments(session, comment_table, post_id):
+    """Remove todos os comentários do post sem carregar os ids."""
+    session.execute(delete(search_index).where(search_index.c.rowid.in_(
+        select(comment_table.c.id * 2 + 1).where(comment_table.c.post_id == post_id))))
+
+
+def rebuild(session, post_table, comment_table, live=None):
+    """Recria o índice inteiro a partir das tabelas de posts e comentários.
+
+    `live` é a condição sobre post_table dos posts que entram (os apagados
+    ficam de fora, e os comentários deles também).
+    """
+    live = true() if live is None else live
+    session.execute(delete(search_index))
+    session.execute(insert(search_index).from_select(
+        ['rowid', 'body', 'post_id'],
+        select(post_table.c.id * 2, post_table.c.body, post_table.c.id).where(live)))
+    session.execute(insert(search_index).from_select(
+        ['rowid', 'body', 'post_id'],
+        select(comment_table.c.id * 2 + 1, comment_table.c.body, comment_table.c.post_id)
+        .join(post_table, post_table.c.id == comment_table.c.post_id).where(live)))
+
+
+def build_match(query):
+    """Converte o texto digitado em uma expressão MATCH segura.
+
+    Só palavras entram (a sintaxe do FTS5 — aspas, NEAR, OR, * — nunca
+    chega crua ao MATCH); cada uma vira um prefixo entre aspas.
+    """
+    terms = _TERM.findall(query.lower())[:MAX_TERMS]
+    if not terms:
+        return None
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def encode_cursor(score, post_id):
+    raw = f"{score!r}|{post_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        score, post_id = raw.decode().split('|')
+        return float(score), int(post_id)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Cursor inválido.")
+
+
+def search_post_ids(session, match, limit, cursor=None):
+    """Ids dos posts mais relevantes e o cursor da próxima página.
+
+    bm25 é menor quanto mais relevante; a ordem (score, post_id) é estável,
+    o que permite paginar por keyset como os feeds.
+    """
+    # bm25() só pode ser chamado na consulta do MATCH, não dentro de um
+    # agregado; o LIMIT impede o SQLite de achatar a subconsulta no GROUP BY.
+    rank = func.bm25(literal_column('search_index'))
+    hits = select(search_index.c.post_id, rank.label('rank')).where(
+        literal_column('search_index').op('MATCH')(match)
+    ).order_by(rank).limit(MAX_HITS).subquery()
+    score = func.min(hits.c.rank).label('score')
+    query = select(hits.c.post_id, score).group_by(hits.c.post_id)
+    if cursor:
+        last_score, last_id = cursor
+        query = query.having((score > last_score) | (
+            (score == last_score) & (hits.c.post_id > last_id)))
+    rows = session.execute(
+        query.order_by(score, hits.c.post_id).limit(limit + 1)).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].score, rows[-1].post_id)
+    return [row.post_id for row in rows], next_cursor
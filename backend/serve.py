@@ -0,0 +1,483 @@
+# brasfut-app/backend/serve.py
+
+"""Launcher de produção: N workers pré-forkados servindo o mesmo socket.
+
+    BRASFUT_CACHE_BACKEND=redis python serve.py --bind 0.0.0.0:8000 --workers 4 \
+        --threads 8 --events-bind 0.0.0.0:8001 --jobs-workers 2
+
+O processo mestre abre o socket, cria os workers com fork e só cuida do
+ciclo de vida; ele nunca importa o app. Cada worker importa `app` e chama
+create_app() depois do fork, então engines, pools de conexão, o pool de
+hash de senha e o cache em memória são sempre do próprio processo, e um
+reload (SIGHUP) carrega o código novo. Ao sair, o worker chama
+stop_streams() antes de drenar e close_app() depois, se o módulo os tiver.
+
+Em cada worker, um servidor WSGI (Werkzeug) atende até --threads conexões
+ao mesmo tempo; uma conexão só é aceita quando há thread livre, e enquanto
+isso ela espera no backlog do kernel, onde outro worker pode pegá-la.
+Conexões keep-alive ociosas por mais de --keepalive segundos são fechadas.
+Cada conexão SSE (/events) ocupa uma thread enquanto estiver aberta, então
+só --events-threads delas são aceitas por worker; as demais threads ficam
+reservadas para a API. Com --events-bind o mestre também sobe (e vigia) o
+events_server.py, um processo asyncio que segura milhares de conexões
+/events; aí o /events dos workers fica desligado e o proxy encaminha a
+rota para o endereço de eventos. Os eventos passam pelo banco (event_log),
+então valem entre todos os processos.
+
+As rotas de escrita só enfileiram os efeitos colaterais (fan-out das
+timelines, índice de busca, tags, purga de posts apagados; ver jobs.py):
+sem alguém consumindo a fila, eles nunca acontecem. Por isso o mestre
+também sobe e vigia o pool de jobs (`flask run-jobs`) com --jobs-workers
+processos (padrão BRASFUT_JOBS_WORKERS ou 2). Use --jobs-workers 0 só se
+a fila for consumida em outro lugar; com BRASFUT_JOBS_EAGER=1 os jobs
+rodam dentro das requisições e o pool não sobe.
+
+Vários workers exigem um cache compartilhado (BRASFUT_CACHE_BACKEND=redis
+ou null): o cache em memória é de cada processo, não vê as invalidações
+dos outros e poderia servir um corpo velho sob um ETag novo. Com o backend
+em memória o padrão é um worker, e --workers maior que 1 é recusado.
+
+O pool de hash de senha também é por worker: sem
+BRASFUT_PASSWORD_HASH_WORKERS, a metade das CPUs que o app usaria num
+processo só é dividida entre os workers.
+
+Sinais do mestre:
+  SIGTERM/SIGINT  desligamento gracioso: os workers param de aceitar,
+                  terminam as requisições em andamento (até
+                  --graceful-timeout) e saem;
+  SIGHUP          reload gracioso: sobe uma geração nova de workers e só
+                  então desliga a antiga, sem recusar conexões.
+
+Timeout de requisição: cada worker publica um heartbeat enquanto nenhuma
+requisição está há mais de --timeout segundos no app; o mestre mata (e
+substitui) o worker cujo heartbeat atrasar mais que isso. O tempo de envio
+de respostas em streaming não conta, só o processamento até o app devolver
+a resposta.
+
+O schema não é tocado no boot: rode `flask db-upgrade` antes ou passe
+--migrate, que aplica as migrações num processo à parte antes de subir os
+workers. Enquanto houver migração pendente, /readyz responde 503.
+"""
+
+import argparse
+import functools
+import importlib
+import logging
+import multiprocessing
+import os
+import secrets
+import signal
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+
+logger = logging.getLogger('brasfut.serve')
+
+HEARTBEAT_SECONDS = 1.0
+
+
+class InFlight:
+    """Middleware WSGI que registra há quanto tempo cada requisição está no app."""
+
+    def __init__(self, app):
+        self.app = app
+        self._started = {}
+
+    def __call__(self, environ, start_response):
+        key = threading.get_ident()
+        self._started[key] = time.monotonic()
+        try:
+            return self.app(environ, start_response)
+        finally:
+            self._started.pop(key, None)
+
+    def oldest(self):
+        now = time.monotonic()
+        return max((now - started for started in list(self._started.values())), default=0.0)
+
+
+class RequestHandler(WSGIRequestHandler):
+    access_log = False
+
+    def log_request(self, code='-', size='-'):
+        if self.access_log:
+            super().log_request(code, size)
+
+    def log_error(self, format, *args):
+        # Keep-alive ocioso que venceu o timeout não é erro
+        if not format.startswith('Request timed out'):
+            super().log_error(format, *args)
+
+
+class PooledWSGIServer(BaseWSGIServer):
+    """Servidor WSGI do Werkzeug com um pool fixo de threads por worker."""
+
+    multithread = True
+    multiprocess = True
+
+    def __init__(self, app, listener, threads, handler):
+        host, port = listener.getsockname()[:2]
+        super().__init__(host, port, app, handler=handler, fd=listener.fileno())
+        self._slots = threading.BoundedSemaphore(threads)
+        self._pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='brasfut-http')
+        self.active = 0
+        self._active_lock = threading.Lock()
+
+    def get_request(self):
+        # Sem thread livre a conexão fica no backlog; o timeout devolve o
+        # controle ao loop para ele perceber um shutdown().
+        if not self._slots.acquire(timeout=HEARTBEAT_SECONDS):
+            raise BlockingIOError()
+        try:
+            return super().get_request()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def process_request(self, request, client_address):
+        with self._active_lock:
+            self.active += 1
+        self._pool.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            with self._active_lock:
+                self.active -= 1
+            self._slots.release()
+
+    def drain(self, timeout):
+        """Espera as requisições em andamento; falso se o prazo acabou."""
+        deadline = time.monotonic() + timeout
+        while self.active and time.monotonic() < deadline:
+            time.sleep(0.05)
+        return not self.active
+
+
+def _worker_main(listener, options, heartbeat):
+    # O mestre repassa SIGINT/SIGHUP como SIGTERM; aqui só o SIGTERM importa.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+
+    module = importlib.import_module(options.module)
+    flask_app = module.create_app()
+    app = InFlight(flask_app)
+    RequestHandler.timeout = options.keepalive
+    RequestHandler.access_log = options.access_log
+    server = PooledWSGIServer(app, listener, options.threads, RequestHandler)
+    stopping = threading.Event()
+
+    def stop(signum, frame):
+        if not stopping.is_set():
+            stopping.set()
+            # shutdown() espera o loop de serve_forever, que roda nesta thread
+            threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+
+    def beat():
+        while not stopping.is_set():
+            if app.oldest() < options.timeout:
+                heartbeat.value = time.time()
+            time.sleep(HEARTBEAT_SECONDS)
+
+    threading.Thread(target=beat, name='brasfut-heartbeat', daemon=True).start()
+    logger.info("Worker %d pronto (%d threads).", os.getpid(), options.threads)
+    server.serve_forever()
+    if hasattr(module, 'stop_streams'):
+        module.stop_streams()
+    drained = server.drain(options.graceful_timeout)
+    if hasattr(module, 'close_app'):
+        module.close_app(flask_app)
+    logging.shutdown()
+    # Threads presas em requisições não podem segurar a saída do processo
+    os._exit(0 if drained else 1)
+
+
+def _events_main(listener, options):
+    # Quem desliga o servidor de eventos é o mestre, com SIGTERM
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    # Importado só aqui, depois do fork, para o reload carregar o código novo
+    import events_server
+    events_server.run(listener, events_server.parse_args(['--module', options.module]),
+                      stop_signals=(signal.SIGTERM,))
+    logging.shutdown()
+
+
+def _jobs_main(options):
+    # Como o servidor de eventos: só o SIGTERM do mestre desliga o pool,
+    # que termina os jobs em andamento antes de sair.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    import jobs
+    module = importlib.import_module(options.module)
+    app = module.create_app()
+    jobs.run_pool(functools.partial(module.job_worker_main, app), options.jobs_workers,
+                  log=logger.info)
+    logging.shutdown()
+
+
+class Arbiter:
+    """Processo mestre: cria, vigia, substitui e desliga os workers.
+
+    Além dos workers HTTP, vigia os serviços auxiliares (servidor de eventos
+    e pool de jobs): um processo cada, recriado se morrer, reiniciado no
+    reload e desligado junto com o resto.
+    """
+
+    def __init__(self, listener, options, events_listener=None):
+        self.listener = listener
+        self.options = options
+        self.events_listener = events_listener
+        self.context = multiprocessing.get_context('fork')
+        self.workers = {}  # pid -> (processo, heartbeat)
+        self.services = {}  # nome -> (alvo, args)
+        if events_listener is not None:
+            self.services['eventos'] = (_events_main, (events_listener, options))
+        if options.jobs_workers:
+            self.services['jobs'] = (_jobs_main, (options,))
+        self.service_processes = {}  # nome -> processo
+        self.retiring = {}  # pid -> prazo para sair antes do SIGKILL
+        self.stopping = False
+        self.reload_requested = False
+
+    def spawn(self):
+        heartbeat = self.context.Value('d', time.time() + self.options.boot_timeout, lock=False)
+        process = self.context.Process(target=_worker_main, name='brasfut-http-worker',
+                                       args=(self.listener, self.options, heartbeat))
+        process.start()
+        self.workers[process.pid] = (process, heartbeat)
+
+    def spawn_service(self, name):
+        target, args = self.services[name]
+        process = self.context.Process(target=target, name=f'brasfut-{name}', args=args)
+        process.start()
+        self.service_processes[name] = process
+
+    def retire(self, pid):
+        process, _ = self.workers.pop(pid)
+        self._terminate(process)
+
+    def retire_service(self, name):
+        process = self.service_processes.pop(name, None)
+        if process is not None:
+            self._terminate(process)
+
+    def _terminate(self, process):
+        self.retiring[process.pid] = (process, time.monotonic() + self.options.graceful_timeout)
+        try:
+            os.kill(process.pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self._on_stop)
+        signal.signal(signal.SIGINT, self._on_stop)
+        signal.signal(signal.SIGHUP, self._on_reload)
+        for _ in range(self.options.workers):
+            self.spawn()
+        for name in self.services:
+            self.spawn_service(name)
+        logger.info("Mestre %d servindo em %s com %d worker(s) HTTP e %d worker(s) de jobs.",
+                    os.getpid(), self.options.bind, self.options.workers,
+                    self.options.jobs_workers)
+        while not self.stopping:
+            if self.reload_requested:
+                self.reload_requested = False
+                self.reload()
+            self.check_workers()
+            self.reap_retiring()
+            time.sleep(0.2)
+        self.shutdown()
+
+    def _on_stop(self, signum, frame):
+        self.stopping = True
+
+    def _on_reload(self, signum, frame):
+        self.reload_requested = True
+
+    def reload(self):
+        logger.info("Reload: subindo %d worker(s) novos.", self.options.workers)
+        old = list(self.workers)
+        for _ in range(self.options.workers):
+            self.spawn()
+        for pid in old:
+            self.retire(pid)
+        # As conexões /events do processo antigo reconectam no novo; o pool
+        # de jobs antigo termina os jobs em andamento e o novo pega o resto.
+        for name in self.services:
+            self.retire_service(name)
+            self.spawn_service(name)
+
+    def check_workers(self):
+        now = time.time()
+        for pid, (process, heartbeat) in list(self.workers.items()):
+            if not process.is_alive():
+                logger.warning("Worker %d saiu (código %s); substituindo.", pid, process.exitcode)
+                del self.workers[pid]
+                process.join()
+                self.spawn()
+            elif now - heartbeat.value > self.options.timeout:
+                logger.error("Worker %d sem heartbeat há %.0fs (requisição acima do timeout);"
+                             " matando.", pid, now - heartbeat.value)
+                os.kill(pid, signal.SIGKILL)
+        for name, process in list(self.service_processes.items()):
+            if not process.is_alive():
+                logger.warning("Serviço %s (%d) saiu (código %s); substituindo.",
+                               name, process.pid, process.exitcode)
+                process.join()
+                self.spawn_service(name)
+
+    def reap_retiring(self):
+        for pid, (process, deadline) in list(self.retiring.items()):
+            if not process.is_alive():
+                process.join()
+                del self.retiring[pid]
+            elif time.monotonic() > deadline:
+                logger.warning("Worker %d não terminou a tempo; SIGKILL.", pid)
+                os.kill(pid, signal.SIGKILL)
+                process.join()
+                del self.retiring[pid]
+
+    def shutdown(self):
+        logger.info("Desligando %d worker(s)...", len(self.workers))
+        for pid in list(self.workers):
+            self.retire(pid)
+        for name in list(self.service_processes):
+            self.retire_service(name)
+        while self.retiring:
+            self.reap_retiring()
+            time.sleep(0.1)
+        self.listener.close()
+        if self.events_listener is not None:
+            self.events_listener.close()
+        logger.info("Servidor encerrado.")
+
+
+def _bind(address, backlog):
+    host, _, port = address.rpartition(':')
+    family = socket.AF_INET6 if ':' in host else socket.AF_INET
+    listener = socket.socket(family, socket.SOCK_STREAM)
+    listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    listener.bind((host.strip('[]') or '0.0.0.0', int(port)))
+    listener.listen(backlog)
+    # Todos os workers acordam com a mesma conexão; não bloqueante, quem
+    # perde a corrida do accept() volta ao loop em vez de ficar preso nele.
+    listener.setblocking(False)
+    listener.set_inheritable(True)
+    return listener
+
+
+def _migrate(module_name):
+    module = importlib.import_module(module_name)
+    app = module.create_app()
+    with app.app_context():
+        module.upgrade_database()
+
+
+def _env_int(name):
+    value = os.environ.get(name)
+    return int(value) if value else None
+
+
+def parse_args(argv=None):
+    env = os.environ.get
+    parser = argparse.ArgumentParser(description='Servidor de produção do backend do Brasfut.')
+    parser.add_argument('--bind', default=env('BRASFUT_BIND', '127.0.0.1:5000'),
+                        help='host:porta (padrão: %(default)s)')
+    parser.add_argument('--workers', type=int, default=_env_int('BRASFUT_WORKERS'),
+                        help='padrão: um por CPU com cache compartilhado, 1 com o cache em memória')
+    parser.add_argument('--threads', type=int, default=int(env('BRASFUT_THREADS', 8)),
+                        help='conexões simultâneas por worker')
+    parser.add_argument('--events-threads', type=int,
+                        default=_env_int('BRASFUT_EVENTS_MAX_SUBSCRIBERS'),
+                        help='threads de cada worker que conexões /events podem ocupar'
+                             ' (padrão: um quarto de --threads; 0 com --events-bind)')
+    parser.add_argument('--events-bind', default=env('BRASFUT_EVENTS_BIND'),
+                        help='host:porta para servir /events pelo events_server.py')
+    parser.add_argument('--jobs-workers', type=int,
+                        default=int(env('BRASFUT_JOBS_WORKERS', 2)),
+                        help='processos da fila de jobs supervisionados pelo mestre'
+                             ' (0 se `flask run-jobs` roda à parte; padrão: %(default)s)')
+    parser.add_argument('--keepalive', type=float, default=float(env('BRASFUT_KEEPALIVE', 5)),
+                        help='segundos de ociosidade antes de fechar uma conexão')
+    parser.add_argument('--timeout', type=float, default=float(env('BRASFUT_TIMEOUT', 30)),
+                        help='tempo máximo de uma requisição no app antes de o worker ser reciclado')
+    parser.add_argument('--graceful-timeout', type=float,
+                        default=float(env('BRASFUT_GRACEFUL_TIMEOUT', 30)))
+    parser.add_argument('--boot-timeout', type=float, default=30,
+                        help='tempo para um worker importar o app e começar a atender')
+    parser.add_argument('--backlog', type=int, default=2048)
+    parser.add_argument('--module', default='app', help='módulo com create_app()')
+    parser.add_argument('--migrate', action='store_true',
+                        help='aplica as migrações pendentes antes de subir os workers')
+    parser.add_argument('--access-log', action='store_true')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    options = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='[%(asctime)s] %(process)d %(levelname)s %(message)s')
+    logging.getLogger('werkzeug').setLevel(logging.INFO if options.access_log else logging.WARNING)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    if not os.environ.get('BRASFUT_SECRET_KEY'):
+        # Sem chave fixa cada worker sortearia a sua e um token emitido por um
+        # não valeria no outro; a chave sorteada aqui vale até o próximo restart.
+        logger.warning("BRASFUT_SECRET_KEY não definida: usando uma chave aleatória por execução.")
+        os.environ['BRASFUT_SECRET_KEY'] = secrets.token_hex(32)
+
+    cache_backend = os.environ.get('BRASFUT_CACHE_BACKEND', 'memory')
+    if options.workers is None:
+        options.workers = 1 if cache_backend == 'memory' else os.cpu_count() or 2
+    elif options.workers > 1 and cache_backend == 'memory':
+        logger.error("--workers %d com o cache em memória: cada worker teria o seu e serviria"
+                     " respostas velhas. Defina BRASFUT_CACHE_BACKEND=redis (ou null) ou use"
+                     " um worker.", options.workers)
+        return 2
+
+    if options.events_threads is None:
+        options.events_threads = 0 if options.events_bind else max(1, options.threads // 4)
+    if options.events_threads >= options.threads:
+        logger.error("--events-threads (%d) precisa ser menor que --threads (%d).",
+                     options.events_threads, options.threads)
+        return 2
+    # Lido pelo create_app() de cada worker (EVENTS_MAX_SUBSCRIBERS)
+    os.environ['BRASFUT_EVENTS_MAX_SUBSCRIBERS'] = str(options.events_threads)
+    if not os.environ.get('BRASFUT_PASSWORD_HASH_WORKERS'):
+        # Cada worker tem o seu pool de hash: o padrão do app (metade das
+        # CPUs) é dividido entre eles em vez de multiplicado.
+        os.environ['BRASFUT_PASSWORD_HASH_WORKERS'] = str(
+            max(1, (os.cpu_count() or 2) // 2 // options.workers))
+
+    if os.environ.get('BRASFUT_JOBS_EAGER') == '1':
+        # Os jobs já rodam dentro das requisições
+        options.jobs_workers = 0
+    elif not options.jobs_workers:
+        logger.warning("Sem workers de jobs (--jobs-workers 0): fan-out, busca, tags e purgas"
+                       " ficam na fila até `flask run-jobs` rodar em outro lugar.")
+
+    if options.migrate:
+        process = multiprocessing.get_context('fork').Process(target=_migrate, args=(options.module,))
+        process.start()
+        process.join()
+        if process.exitcode:
+            logger.error("Migração falhou (código %s).", process.exitcode)
+            return 1
+
+    events_listener = _bind(options.events_bind, options.backlog) if options.events_bind else None
+    Arbiter(_bind(options.bind, options.backlog), options, events_listener).run()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
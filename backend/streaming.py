@@ -0,0 +1,161 @@
+# brasfut-app/backend/streaming.py
+
+"""Respostas JSON em streaming e encoder JSON plugável.
+
+As listas completas (rotas chamadas sem `limit` nem cursor) podem ter
+milhares de itens; montar a lista inteira e passá-la ao jsonify dobra o
+pico de memória da requisição e só envia o primeiro byte depois que o
+último item foi serializado. json_array/json_object serializam item a
+item a partir de um iterador (em app.py, consultas com yield_per) e
+entregam pedaços de ~CHUNK_BYTES, então a memória não cresce com a lista.
+Um erro no meio do stream só pode truncar a resposta: o status 200 já foi
+enviado.
+
+O encoder vem de JSON_ENCODER: 'orjson' (bem mais rápido, se instalado),
+'json' (biblioteca padrão) ou 'auto' (o orjson quando disponível). O
+FastJSONProvider usa o mesmo encoder no jsonify das outras rotas. A saída
+é a do provider padrão do Flask (chaves ordenadas, sem espaços), exceto
+pelos caracteres não ASCII, que saem em UTF-8 em vez de \\uXXXX.
+
+Com compressão ligada, gzip ou br (este só com o módulo brotli instalado)
+são negociados pelo Accept-Encoding e aplicados pedaço a pedaço, com flush
+a cada pedaço para o cliente começar a receber sem esperar o fim.
+"""
+
+import json
+import zlib
+from collections.abc import Iterator
+
+from flask import current_app, request, stream_with_context
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+CHUNK_BYTES = 64 * 1024
+
+
+def create_encoder(name='auto'):
+    """Função encode(obj, indent=False, default=None) -> bytes."""
+    if name == 'auto':
+        name = 'orjson' if orjson is not None else 'json'
+    if name == 'orjson':
+        if orjson is None:
+            raise RuntimeError("JSON_ENCODER = 'orjson', mas o orjson não está instalado.")
+
+        def encode(obj, indent=False, default=None):
+            option = orjson.OPT_SORT_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+            return orjson.dumps(obj, default=default, option=option)
+    elif name == 'json':
+        def encode(obj, indent=False, default=None):
+            return json.dumps(obj, default=default, ensure_ascii=False, sort_keys=True,
+                              indent=2 if indent else None,
+                              separators=None if indent else (',', ':')).encode()
+    else:
+        raise ValueError(f"JSON_ENCODER desconhecido: {name!r}")
+    encode.backend = name
+    return encode
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Provider JSON do Flask que serializa com o encoder de JSON_ENCODER."""
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.encode = create_encoder(app.config.get('JSON_ENCODER', 'auto'))
+
+    def dumps(self, obj, **kwargs):
+        # jsonify só passa indent/separators; outras opções ficam com o json
+        if set(kwargs) - {'indent', 'separators'}:
+            return super().dumps(obj, **kwargs)
+        return self.encode(obj, indent=bool(kwargs.get('indent')),
+                           default=self.default).decode()
+
+
+def json_array(items, encode, chunk_bytes=CHUNK_BYTES, opening=b''):
+    """Pedaços (bytes) de um array JSON com os itens do iterador.
+
+    `opening` é emitido antes do '[' no primeiro pedaço (usado por
+    json_object para não mandar a chave num pedaço separado).
+    """
+    buffer = bytearray(opening)
+    buffer += b'['
+    first = True
+    for item in items:
+        if not first:
+            buffer += b','
+        buffer += encode(item)
+        first = False
+        if len(buffer) >= chunk_bytes:
+            yield bytes(buffer)
+            buffer.clear()
+    buffer += b']'
+    yield bytes(buffer)
+
+
+def json_object(fields, encode, chunk_bytes=CHUNK_BYTES):
+    """Pedaços de um objeto JSON; valores que são iteradores viram arrays em streaming.
+
+    As chaves saem ordenadas, como no jsonify.
+    """
+    pending = b'{'
+    for index, (key, value) in enumerate(sorted(fields.items())):
+        pending += (b',' if index else b'') + encode(key) + b':'
+        if isinstance(value, Iterator):
+            last = None
+            for chunk in json_array(value, encode, chunk_bytes, opening=pending):
+                if last is not None:
+                    yield last
+                last = chunk
+            pending = last
+        else:
+            pending += encode(value)
+    yield pending + b'}'
+
+
+def negotiate_encoding(accept_encodings):
+    for encoding in ('br', 'gzip'):
+        if encoding == 'br' and brotli is None:
+            continue
+        if accept_encodings.quality(encoding) > 0:
+            return encoding
+    return None
+
+
+def compress(chunks, encoding, level):
+    if encoding == 'gzip':
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+        for chunk in chunks:
+            out = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            if out:
+                yield out
+        yield compressor.flush()
+    else:
+        compressor = brotli.Compressor(quality=min(level, 11))
+        for chunk in chunks:
+            out = compressor.process(chunk) + compressor.flush()
+            if out:
+                yield out
+        yield compressor.finish()
+
+
+def json_response(chunks, compression=False, level=6, status=200):
+    """Response em streaming para os pedaços de json_array/json_object.
+
+    O contexto da requisição fica ativo enquanto o corpo é gerado, então o
+    iterador pode continuar usando db.session.
+    """
+    headers = {'Vary': 'Accept-Encoding'}
+    encoding = negotiate_encoding(request.accept_encodings) if compression else None
+    if encoding:
+        chunks = compress(chunks, encoding, level)
+        headers['Content-Encoding'] = encoding
+    return current_app.response_class(stream_with_context(chunks), status=status,
+                                      mimetype='application/json', headers=headers)
@@ -0,0 +1,106 @@
+# brasfut-app/backend/suggestions.py
+
+"""Cálculo em lote das sugestões de quem seguir.
+
+O grafo vem inteiro do banco uma vez e fica em listas de adjacência no
+formato CSR (indptr/indices): os vizinhos de u são
+indices[indptr[u]:indptr[u + 1]]. Com NumPy instalado as listas são
+arrays e a contagem de candidatos é vetorizada; sem NumPy o mesmo formato
+usa `array` da biblioteca padrão e um Counter.
+
+Pontuação de um candidato w para o usuário u:
+  * FOF_WEIGHT para cada pessoa que u segue e que segue w;
+  * COLIKE_WEIGHT / log2(2 + curtidas do post) para cada post que u e w
+    curtiram, para que um post viral não faça todo mundo "parecido".
+Quem u já segue (a lista inteira, não só os MAX_NEIGHBORS que geram
+candidatos) e o próprio u ficam de fora. As curtidas do post também são a
+contagem total, não só as MAX_LIKERS_PER_POST que entram no cálculo.
+"""
+
+import math
+from array import array
+from collections import Counter
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+FOF_WEIGHT = 1.0
+COLIKE_WEIGHT = 0.5
+# Limites de trabalho por usuário: quantos vizinhos de cada lista entram
+# no cálculo (os mais recentes, já que as listas vêm ordenadas por tempo).
+MAX_NEIGHBORS = 500
+MAX_LIKERS_PER_POST = 200
+
+
+def build_csr(pairs, size):
+    """Adjacência CSR a partir de pares (origem, destino) ordenados por origem."""
+    counts = [0] * (size + 1)
+    targets = array('l')
+    for source, target in pairs:
+        counts[source + 1] += 1
+        targets.append(target)
+    for i in range(size):
+        counts[i + 1] += counts[i]
+    if numpy is not None:
+        return numpy.asarray(counts, dtype=numpy.int64), numpy.array(targets, dtype=numpy.int64)
+    return array('l', counts), targets
+
+
+def _neighbors(csr, node, limit=MAX_NEIGHBORS):
+    indptr, indices = csr
+    if node + 1 >= len(indptr):
+        return indices[0:0]
+    end = indptr[node + 1]
+    return indices[max(indptr[node], end - limit):end]
+
+
+def _degree(csr, node):
+    indptr = csr[0]
+    if node + 1 >= len(indptr):
+        return 0
+    return int(indptr[node + 1] - indptr[node])
+
+
+def score_user(user_id, follows, likes, likers, limit):
+    """Top `limit` candidatos de user_id como [(candidato, score)]."""
+    following = _neighbors(follows, user_id)
+    weights = Counter()
+
+    liked = _neighbors(likes, user_id)
+    liked_posts = [_neighbors(likers, post_id, MAX_LIKERS_PER_POST) for post_id in liked]
+    like_counts = [_degree(likers, post_id) for post_id in liked]
+
+    if numpy is not None:
+        if len(following):
+            fof = numpy.concatenate([_neighbors(follows, v) for v in following])
+            candidates, counts = numpy.unique(fof, return_counts=True)
+            for candidate, count in zip(candidates.tolist(), counts.tolist()):
+                weights[candidate] += FOF_WEIGHT * count
+        if liked_posts:
+            sizes = numpy.array([len(post_likers) for post_likers in liked_posts])
+            colikers = numpy.concatenate(liked_posts)
+            candidates, inverse = numpy.unique(colikers, return_inverse=True)
+            sums = numpy.bincount(inverse, weights=numpy.repeat(
+                COLIKE_WEIGHT / numpy.log2(2 + numpy.array(like_counts)), sizes))
+            for candidate, weight in zip(candidates.tolist(), sums.tolist()):
+                weights[candidate] += weight
+    else:
+        for v in following:
+            for w in _neighbors(follows, v):
+                weights[w] += FOF_WEIGHT
+        for post_likers, like_count in zip(liked_posts, like_counts):
+            weight = COLIKE_WEIGHT / math.log2(2 + like_count)
+            for w in post_likers:
+                weights[w] += weight
+
+    indptr, indices = follows
+    followed = (indices[indptr[user_id]:indptr[user_id + 1]]
+                if user_id + 1 < len(indptr) else indices[0:0])
+    excluded = set(followed.tolist() if numpy is not None else followed)
+    excluded.add(user_id)
+    ranked = [(candidate, score) for candidate, score in weights.items()
+              if candidate not in excluded]
+    ranked.sort(key=lambda item: (-item[1], item[0]))
+    return [(candidate, round(score, 4)) for candidate, score in ranked[:limit]]
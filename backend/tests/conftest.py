@@ -0,0 +1,45 @@
+# brasfut-app/backend/tests/conftest.py
+
+"""Fixtures comuns: um app por teste, com banco SQLite próprio em tmp_path.
+
+Os testes rodam com JOBS_EAGER (os jobs das rotas executam na própria
+requisição) e hash de senha barato na própria thread.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as brasfut  # noqa: E402
+
+TEST_CONFIG = {
+    'TESTING': True,
+    'JOBS_EAGER': True,
+    'CACHE_BACKEND': 'null',
+    'PASSWORD_HASH_WORKERS': 0,
+    'PASSWORD_HASH_METHOD': 'pbkdf2:sha256:1',
+    'LOGIN_MAX_ATTEMPTS_PER_IP': 0,
+}
+
+
+def make_app(database_path, **config):
+    return brasfut.create_app({
+        **TEST_CONFIG, 'SQLALCHEMY_DATABASE_URI': f'sqlite:///{database_path}', **config})
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = make_app(tmp_path / 'test.db')
+    with app.app_context():
+        brasfut.upgrade_database()
+    yield app
+    brasfut.close_app(app)
+
+
+@pytest.fixture
+def session(app):
+    with app.app_context():
+        yield brasfut.db.session
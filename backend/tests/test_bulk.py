@@ -0,0 +1,25 @@
+# brasfut-app/backend/tests/test_bulk.py
+
+import json
+
+import app as brasfut
+
+
+def test_corrupt_ndjson_line_is_rejected_and_import_continues(app, tmp_path):
+    path = tmp_path / 'users.ndjson'
+    lines = [json.dumps({"username": f"u{i}", "email": f"u{i}@x", "password_hash": "x"})
+             for i in range(4)]
+    lines.insert(2, '{"username": "quebrado", ')
+    path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+
+    result = app.test_cli_runner().invoke(args=['import-data', 'users', str(path),
+                                                '--batch-size', '2', '--no-rebuild'])
+    assert result.exit_code == 0, result.output
+    assert "5 processado(s), 4 inserido(s), 0 já existente(s), 1 rejeitado(s)" in result.output
+
+    (reject,) = [json.loads(line) for line in open(f'{path}.rejects', encoding='utf-8')]
+    assert reject["position"] == 3
+    assert reject["record"] == '{"username": "quebrado",'
+    assert reject["reason"].startswith('JSON inválido')
+    with app.app_context():
+        assert brasfut.db.session.query(brasfut.User).count() == 4
@@ -0,0 +1,155 @@
+# brasfut-app/backend/tests/test_jobs.py
+
+import datetime
+
+from sqlalchemy import select, update
+
+import app as brasfut
+import jobs
+from conftest import make_app
+
+
+def job_row(session, job_id):
+    return session.execute(select(jobs.jobs).where(jobs.jobs.c.id == job_id)).one()
+
+
+def expire_lease(session, job_id):
+    session.execute(update(jobs.jobs).where(jobs.jobs.c.id == job_id).values(
+        locked_until=jobs._now() - datetime.timedelta(seconds=1)))
+    session.commit()
+
+
+def test_enqueue_ignores_repeated_idempotency_key(session):
+    jobs.enqueue(session, 'post_created', {'post_id': 1}, key='post_created:1')
+    jobs.enqueue(session, 'post_created', {'post_id': 1}, key='post_created:1')
+    session.commit()
+
+    assert jobs.stats(session, 60)['pending'] == 1
+
+
+def test_claim_takes_each_ready_job_once(session):
+    jobs.enqueue(session, 'a', {})
+    jobs.enqueue(session, 'b', {}, delay=3600)
+    session.commit()
+
+    token, claimed = jobs.claim(session, 10, lease_seconds=60)
+    assert [job.kind for job in claimed] == ['a']
+    assert claimed[0].attempts == 1
+    row = job_row(session, claimed[0].id)
+    assert row.status == jobs.RUNNING and row.locked_by == token
+
+    # Em execução com lease válido, e o outro ainda não venceu o run_at
+    assert jobs.claim(session, 10, lease_seconds=60)[1] == []
+
+
+def test_expired_lease_is_reclaimed_and_old_owner_loses_it(session):
+    jobs.enqueue(session, 'a', {})
+    session.commit()
+    old_token, (job,) = jobs.claim(session, 10, lease_seconds=60)
+
+    expire_lease(session, job.id)
+    new_token, (again,) = jobs.claim(session, 10, lease_seconds=60)
+    assert again.id == job.id and again.attempts == 2
+
+    assert not jobs.complete(session, job.id, old_token)
+    session.rollback()
+    assert jobs.complete(session, job.id, new_token)
+    session.commit()
+    assert job_row(session, job.id).status == jobs.DONE
+
+
+def test_fail_reschedules_with_backoff(session):
+    jobs.enqueue(session, 'a', {})
+    session.commit()
+    token, (job,) = jobs.claim(session, 10, lease_seconds=60)
+
+    dead = jobs.fail(session, job, token, 'ValueError: x', max_attempts=3,
+                     backoff_base=10, backoff_max=300)
+    session.commit()
+
+    assert not dead
+    row = job_row(session, job.id)
+    assert row.status == jobs.PENDING and row.locked_by is None
+    assert row.last_error == 'ValueError: x'
+    # Jitter entre metade e o total do atraso da primeira tentativa
+    assert row.run_at >= jobs._now() + datetime.timedelta(seconds=4)
+    assert jobs.claim(session, 10, lease_seconds=60)[1] == []
+
+
+def test_fail_moves_job_to_dead_jobs_after_max_attempts(session):
+    jobs.enqueue(session, 'a', {'x': 1}, key='a:1')
+    session.commit()
+    token, (job,) = jobs.claim(session, 10, lease_seconds=60)
+
+    assert jobs.fail(session, job, token, 'boom', max_attempts=1, backoff_base=1, backoff_max=1)
+    session.commit()
+
+    assert session.execute(select(jobs.jobs)).all() == []
+    (dead,) = session.execute(select(jobs.dead_jobs)).all()
+    assert (dead.kind, dead.payload, dead.idempotency_key, dead.attempts, dead.last_error) == \
+        ('a', '{"x": 1}', 'a:1', 1, 'boom')
+
+    assert jobs.requeue_dead(session) == 1
+    assert jobs.stats(session, 60)['pending'] == 1
+
+
+def test_worker_completes_and_retries(app, session):
+    calls = []
+
+    def flaky(n):
+        calls.append(n)
+        if len(calls) == 1:
+            raise RuntimeError('primeira falha')
+
+    jobs.enqueue(session, 'flaky', {'n': 7})
+    session.commit()
+    worker = jobs.Worker(session, {'flaky': flaky},
+                         {**app.config, 'JOBS_BACKOFF_SECONDS': 0, 'JOBS_BACKOFF_MAX_SECONDS': 0})
+
+    assert worker.run_once() == 1
+    (row,) = session.execute(select(jobs.jobs)).all()
+    assert row.status == jobs.PENDING and row.last_error == 'RuntimeError: primeira falha'
+
+    assert worker.run_once() == 1
+    assert calls == [7, 7]
+    assert job_row(session, row.id).status == jobs.DONE
+
+
+def test_eager_mode_runs_route_jobs_inline(app):
+    client = app.test_client()
+    client.post('/register', json={'username': 'ana', 'email': 'ana@x', 'password': 'segredo'})
+    token = client.post('/login', json={'username': 'ana', 'password': 'segredo'}).get_json()['token']
+
+    response = client.post('/posts', json={'body': 'vamos #brasfut'},
+                           headers={'Authorization': f'Bearer {token}'})
+    assert response.status_code == 201
+
+    with app.app_context():
+        assert jobs.stats(brasfut.db.session, 60)['pending'] == 0
+        assert brasfut.db.session.query(brasfut.PostTag.tag).all() == [('brasfut',)]
+
+
+def test_eager_purge_runs_every_batch_without_recursion(tmp_path):
+    app = make_app(tmp_path / 'test.db', POST_PURGE_BATCH_SIZE=5)
+    try:
+        with app.app_context():
+            db = brasfut.db
+            brasfut.upgrade_database()
+            db.session.execute(db.insert(brasfut.User), [
+                {"id": user_id, "username": f"u{user_id}", "email": f"u{user_id}@x",
+                 "password_hash": "x"} for user_id in range(1, 3001)])
+            db.session.add(brasfut.Post(id=1, user_id=1, body='viral'))
+            db.session.execute(db.insert(brasfut.Like), [
+                {"user_id": user_id, "post_id": 1} for user_id in range(1, 3001)])
+            db.session.commit()
+            token = brasfut.tokens.issue(1, 'u1')
+
+        response = app.test_client().delete(
+            '/posts/1', headers={'Authorization': f'Bearer {token}'})
+        assert response.status_code == 200
+
+        with app.app_context():
+            assert brasfut.db.session.query(brasfut.Post).count() == 0
+            assert brasfut.db.session.query(brasfut.Like).count() == 0
+    finally:
+        brasfut.close_app(app)
@@ -0,0 +1,130 @@
+# brasfut-app/backend/tests/test_migrations.py
+
+import sqlite3
+
+from sqlalchemy import inspect
+
+import app as brasfut
+import migrations
+from conftest import make_app
+
+# Schema do brasfut_microblog.db original, antes do mecanismo de migrações
+LEGACY_SCHEMA = """
+CREATE TABLE user (
+    id INTEGER NOT NULL, username VARCHAR(80) NOT NULL, email VARCHAR(120) NOT NULL,
+    password_hash VARCHAR(128) NOT NULL,
+    PRIMARY KEY (id), UNIQUE (username), UNIQUE (email));
+CREATE TABLE post (
+    id INTEGER NOT NULL, body VARCHAR(280) NOT NULL, timestamp DATETIME,
+    user_id INTEGER NOT NULL,
+    PRIMARY KEY (id), FOREIGN KEY(user_id) REFERENCES user (id));
+CREATE INDEX ix_post_timestamp ON post (timestamp);
+CREATE TABLE follow (
+    follower_id INTEGER NOT NULL, followed_id INTEGER NOT NULL, timestamp DATETIME,
+    PRIMARY KEY (follower_id, followed_id),
+    CONSTRAINT _follower_followed_uc UNIQUE (follower_id, followed_id),
+    FOREIGN KEY(follower_id) REFERENCES user (id), FOREIGN KEY(followed_id) REFERENCES user (id));
+CREATE TABLE comment (
+    id INTEGER NOT NULL, body VARCHAR(500) NOT NULL, timestamp DATETIME,
+    user_id INTEGER NOT NULL, post_id INTEGER NOT NULL,
+    PRIMARY KEY (id), FOREIGN KEY(user_id) REFERENCES user (id),
+    FOREIGN KEY(post_id) REFERENCES post (id));
+CREATE INDEX ix_comment_timestamp ON comment (timestamp);
+CREATE TABLE "like" (
+    user_id INTEGER NOT NULL, post_id INTEGER NOT NULL, timestamp DATETIME,
+    PRIMARY KEY (user_id, post_id), CONSTRAINT _user_post_uc UNIQUE (user_id, post_id),
+    FOREIGN KEY(user_id) REFERENCES user (id), FOREIGN KEY(post_id) REFERENCES post (id));
+
+INSERT INTO user VALUES (1, 'ana', 'ana@x', 'pbkdf2:sha256:1$x$y'), (2, 'bia', 'bia@x', 'pbkdf2:sha256:1$x$y');
+INSERT INTO post VALUES (1, 'golaço do #flamengo', '2024-05-01 12:00:00', 1);
+INSERT INTO comment VALUES (1, 'que jogo', '2024-05-01 12:05:00', 2, 1);
+INSERT INTO "like" VALUES (2, 1, '2024-05-01 12:06:00');
+INSERT INTO follow VALUES (2, 1, '2024-04-01 10:00:00');
+"""
+
+
+def pending_versions(db):
+    with db.engine.connect() as connection:
+        return migrations.pending_versions(connection, brasfut.MIGRATIONS)
+
+
+def test_upgrade_from_legacy_schema(tmp_path):
+    path = tmp_path / 'legacy.db'
+    with sqlite3.connect(path) as connection:
+        connection.executescript(LEGACY_SCHEMA)
+
+    app = make_app(path)
+    try:
+        with app.app_context():
+            db = brasfut.db
+            assert pending_versions(db)
+
+            applied = brasfut.upgrade_database()
+            assert applied == [version for version, _, _ in brasfut.MIGRATIONS]
+            assert pending_versions(db) == []
+
+            post = db.session.get(brasfut.Post, 1)
+            assert (post.likes_count, post.comments_count, post.deleted_at) == (1, 1, None)
+            assert db.session.get(brasfut.User, 1).followers_count == 1
+            assert sorted(db.session.query(brasfut.TimelineEntry.user_id)) == [(1,), (2,)]
+            assert db.session.query(brasfut.PostTag.tag).all() == [('flamengo',)]
+
+            tables = inspect(db.engine).get_table_names()
+            assert {'jobs', 'dead_jobs', 'event_log', 'user_suggestion'} <= set(tables)
+            assert 'content_version' not in tables
+            indexes = {index['name'] for index in inspect(db.engine).get_indexes('comment')}
+            assert indexes == {'ix_comment_post_timestamp'}
+
+            # Idempotente: rodar de novo não aplica nada
+            assert brasfut.upgrade_database() == []
+    finally:
+        brasfut.close_app(app)
+
+
+def test_upgraded_legacy_database_serves_routes(tmp_path):
+    path = tmp_path / 'legacy.db'
+    with sqlite3.connect(path) as connection:
+        connection.executescript(LEGACY_SCHEMA)
+
+    app = make_app(path)
+    try:
+        with app.app_context():
+            brasfut.upgrade_database()
+        response = app.test_client().get('/posts?limit=10')
+        assert response.status_code == 200
+        (post,) = response.get_json()['posts']
+        assert (post['id'], post['likes_count'], post['comments_count']) == (1, 1, 1)
+    finally:
+        brasfut.close_app(app)
+
+
+def test_readyz_with_read_pool(tmp_path):
+    # Com DB_READ_POOL o escritor tem uma conexão só; a checagem não pode
+    # disputá-la com a sessão da requisição.
+    app = make_app(tmp_path / 'test.db', DB_READ_POOL=True)
+    try:
+        with app.app_context():
+            brasfut.upgrade_database()
+            brasfut.db.session.execute(migrations.schema_migrations.delete().where(
+                migrations.schema_migrations.c.version == 12))
+            brasfut.db.session.commit()
+        client = app.test_client()
+        assert client.get('/readyz').get_json() == {"status": "pending_migrations", "pending": [12]}
+
+        with app.app_context():
+            brasfut.upgrade_database()
+        assert client.get('/readyz').get_json() == {"status": "ready"}
+    finally:
+        brasfut.close_app(app)
+
+
+def test_upgrade_without_read_pool_after_app_with_read_pool(tmp_path):
+    brasfut.close_app(make_app(tmp_path / 'pooled.db', DB_READ_POOL=True))
+
+    app = make_app(tmp_path / 'plain.db')
+    try:
+        with app.app_context():
+            brasfut.upgrade_database()
+            assert pending_versions(brasfut.db) == []
+    finally:
+        brasfut.close_app(app)
@@ -0,0 +1,41 @@
+# brasfut-app/backend/tests/test_suggestions.py
+
+import math
+
+import pytest
+
+import suggestions
+
+
+@pytest.fixture(params=['numpy', 'puro'])
+def backend(request, monkeypatch):
+    if request.param == 'puro':
+        monkeypatch.setattr(suggestions, 'numpy', None)
+    elif suggestions.numpy is None:
+        pytest.skip('NumPy não instalado')
+    return request.param
+
+
+def csr(pairs, size):
+    return suggestions.build_csr(sorted(pairs, key=lambda pair: pair[0]), size)
+
+
+def test_never_suggests_accounts_beyond_the_neighbor_cap(backend):
+    # 0 segue 1..600; 600 (entre os mais recentes) segue 2, que está além
+    # dos MAX_NEIGHBORS que geram candidatos mas continua seguido.
+    follows = csr([(0, v) for v in range(1, 601)] + [(600, 2)], 602)
+    empty = csr([], 602)
+
+    assert suggestions.score_user(0, follows, empty, empty, 10) == []
+
+
+def test_colike_weight_uses_the_full_like_count(backend):
+    # Post 0 tem 300 curtidas (mais que MAX_LIKERS_PER_POST); 0 e 300 curtiram
+    likes_pairs = [(u, 0) for u in range(301)]
+    likes = csr(likes_pairs, 302)
+    likers = csr([(post, user) for user, post in likes_pairs], 2)
+    follows = csr([], 302)
+
+    ranked = dict(suggestions.score_user(0, follows, likes, likers, 500))
+    assert ranked[300] == round(suggestions.COLIKE_WEIGHT / math.log2(2 + 301), 4)
+    assert len(ranked) == suggestions.MAX_LIKERS_PER_POST
@@ -0,0 +1,22 @@
+# brasfut-app/backend/tests/test_timelines.py
+
+import app as brasfut
+
+
+def test_follow_backfill_skips_tombstoned_posts(app):
+    with app.app_context():
+        db = brasfut.db
+        db.session.add_all([brasfut.User(id=1, username='ana', email='ana@x', password_hash='x'),
+                            brasfut.User(id=2, username='bia', email='bia@x', password_hash='x')])
+        db.session.add_all([brasfut.Post(id=1, user_id=1, body='fica'),
+                            brasfut.Post(id=2, user_id=1, body='apagado',
+                                         deleted_at=brasfut.utcnow())])
+        db.session.commit()
+        token = brasfut.tokens.issue(2, 'bia')
+
+    response = app.test_client().post('/follow/1', headers={'Authorization': f'Bearer {token}'})
+    assert response.status_code in (200, 201)
+
+    with app.app_context():
+        assert brasfut.db.session.query(brasfut.TimelineEntry.post_id).filter_by(
+            user_id=2).all() == [(1,)]
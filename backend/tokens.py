@@ -0,0 +1,66 @@
+# brasfut-app/backend/tokens.py
+
+"""Tokens de autenticação assinados com HMAC-SHA256, sem estado no servidor.
+
+Formato: base64url(payload JSON) + '.' + base64url(assinatura). O payload
+leva o id e o username do usuário, o tipo ('access' ou 'refresh') e a
+expiração (epoch em segundos). Como a assinatura basta para confiar nas
+claims, as rotas de escrita autenticam sem ler o banco.
+
+O token de acesso é curto (TOKEN_ACCESS_TTL); o de refresh, longo, só serve
+para /token/refresh. Todos os workers precisam da mesma SECRET_KEY.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import time
+
+
+class InvalidToken(Exception):
+    pass
+
+
+def _b64encode(raw):
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode('ascii')
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+
+class TokenSigner:
+    def __init__(self, secret, access_ttl, refresh_ttl):
+        self.secret = secret.encode('utf-8') if isinstance(secret, str) else secret
+        self.ttls = {'access': access_ttl, 'refresh': refresh_ttl}
+
+    def _sign(self, payload):
+        return hmac.new(self.secret, payload.encode('ascii'), hashlib.sha256).digest()
+
+    def issue(self, user_id, username, kind='access'):
+        claims = {"uid": user_id, "usr": username, "typ": kind,
+                  "exp": int(time.time()) + self.ttls[kind]}
+        payload = _b64encode(json.dumps(claims, separators=(',', ':')).encode('utf-8'))
+        return payload + '.' + _b64encode(self._sign(payload))
+
+    def issue_pair(self, user_id, username):
+        return {"token": self.issue(user_id, username),
+                "refresh_token": self.issue(user_id, username, 'refresh'),
+                "expires_in": self.ttls['access']}
+
+    def verify(self, token, kind='access'):
+        """Devolve as claims ou levanta InvalidToken."""
+        try:
+            payload, signature = token.split('.')
+            valid = hmac.compare_digest(self._sign(payload), _b64decode(signature))
+            claims = json.loads(_b64decode(payload)) if valid else None
+        except (ValueError, UnicodeError):
+            raise InvalidToken('Token malformado.')
+        if claims is None:
+            raise InvalidToken('Assinatura inválida.')
+        if claims.get('typ') != kind:
+            raise InvalidToken('Tipo de token inválido.')
+        if claims.get('exp', 0) < time.time():
+            raise InvalidToken('Token expirado.')
+        return claims
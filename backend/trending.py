@@ -0,0 +1,60 @@
+# brasfut-app/backend/trending.py
+
+"""Extração de #hashtags/@menções e ranking de assuntos do momento.
+
+As funções aqui não tocam no banco: app.py grava as tags de cada post em
+PostTag e soma contadores por minuto em TrendBucket na mesma transação do
+post; o ranking lê só os baldes da janela (TRENDING_WINDOW_MINUTES) e
+aplica decaimento exponencial, com meia-vida TRENDING_HALF_LIFE_MINUTES,
+para que um assunto de 2 minutos atrás pese mais que um de 50.
+"""
+
+import datetime
+import re
+import unicodedata
+
+HASHTAG = 'hashtag'
+MENTION = 'mention'
+
+MAX_TAG_LENGTH = 100
+_TAG = re.compile(r'(?<!\w)([#@])(\w+)', re.UNICODE)
+
+
+def normalize_tag(text):
+    """Minúsculas e sem acentos: #Grêmio, #gremio e #GREMIO são a mesma tag."""
+    folded = unicodedata.normalize('NFKD', text.lower())
+    return ''.join(char for char in folded if not unicodedata.combining(char))[:MAX_TAG_LENGTH]
+
+
+def extract_tags(body):
+    """Conjunto de (kind, tag) citados no texto, sem repetição."""
+    return {(HASHTAG if sigil == '#' else MENTION, normalize_tag(word))
+            for sigil, word in _TAG.findall(body)}
+
+
+def epoch_minute(moment):
+    # O SQLite devolve datetimes sem fuso; no banco eles estão em UTC
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=datetime.timezone.utc)
+    return int(moment.timestamp() // 60)
+
+
+def rank(bucket_rows, now_minute, half_life, limit):
+    """Top-K por kind a partir de linhas (kind, tag, minute, count).
+
+    Devolve {kind: [{"tag", "score", "count"}, ...]} ordenado por score.
+    """
+    totals = {}
+    for kind, tag, minute, count in bucket_rows:
+        weight = 0.5 ** (max(now_minute - minute, 0) / half_life)
+        entry = totals.setdefault((kind, tag), [0.0, 0])
+        entry[0] += count * weight
+        entry[1] += count
+    ranked = {HASHTAG: [], MENTION: []}
+    for (kind, tag), (score, count) in totals.items():
+        if count > 0:
+            ranked[kind].append({"tag": tag, "score": round(score, 3), "count": count})
+    for kind in ranked:
+        ranked[kind].sort(key=lambda item: (-item["score"], item["tag"]))
+        del ranked[kind][limit:]
+    return ranked
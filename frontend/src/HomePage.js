@@ -8,7 +8,7 @@ import CommentModal from './components/CommentModal';
 import './App.css';
 
 function HomePage() {
-  const { isLoggedIn, userId, username } = useContext(AuthContext);
+  const { isLoggedIn, userId, username, authFetch } = useContext(AuthContext);
   const [posts, setPosts] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
@@ -98,23 +98,15 @@ function HomePage() {
       return;
     }
     setLikeLoadingMap(prev => ({ ...prev, [postId]: true }));
-    const url = `http://localhost:5000/posts/${postId}/${isCurrentlyLiked ? 'unlike' : 'like'}`;
+    const url = `/posts/${postId}/${isCurrentlyLiked ? 'unlike' : 'like'}`;
     try {
-      const response = await fetch(url, {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ user_id: userId }),
-      });
+      const response = await authFetch(url, { method: 'POST' });
       if (!response.ok) {
         const errorData = await response.json();
         throw new Error(errorData.message || 'Falha ao curtir/descurtir.');
       }
-      const updatedPostResponse = await fetch(`http://localhost:5000/posts/${postId}?logged_in_user_id=${userId}`);
-      if (!updatedPostResponse.ok) {
-        console.warn(`Aviso: Falha ao carregar postagem individual atualizada para o post ${postId}.`);
-        return;
-      }
-      const updatedPost = await updatedPostResponse.json();
+      // A resposta do like/unlike já traz o post com contagens e is_liked atualizados
+      const { post: updatedPost } = await response.json();
       setPosts(prevPosts => prevPosts.map(post =>
         post.id === updatedPost.id ? updatedPost : post
       ));
@@ -124,7 +116,7 @@ function HomePage() {
     } finally {
       setLikeLoadingMap(prev => ({ ...prev, [postId]: false }));
     }
-  }, [isLoggedIn, userId]);
+  }, [isLoggedIn, authFetch]);
 
   const handleCommentClick = useCallback((postId) => {
     setSelectedPostId(postId);
@@ -155,11 +147,7 @@ function HomePage() {
     }
 
     try {
-      const response = await fetch(`http://localhost:5000/posts/${postId}`, {
-        method: 'DELETE',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ user_id: userId }),
-      });
+      const response = await authFetch(`/posts/${postId}`, { method: 'DELETE' });
 
       if (!response.ok) {
         const errorData = await response.json();
@@ -171,7 +159,7 @@ function HomePage() {
       console.error('Erro ao excluir post:', err);
       alert(err.message);
     }
-  }, [isLoggedIn, userId, fetchPosts]);
+  }, [isLoggedIn, userId, authFetch, fetchPosts]);
 
 
   return (
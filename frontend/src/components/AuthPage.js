@@ -37,7 +37,7 @@ function AuthPage() {
       const data = await response.json();
       if (response.ok) {
         setLoginMessage(`Bem-vindo, ${data.username}!`);
-        login(data.user_id, data.username);
+        login(data.user_id, data.username, data.token, data.refresh_token);
         navigate('/');
       } else {
         setLoginMessage('Erro: ' + data.message);
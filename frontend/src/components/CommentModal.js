@@ -5,7 +5,7 @@ import { AuthContext } from '../context/AuthContext';
 import '../App.css'; // Estilos globais
 
 function CommentModal({ postId, onClose, onCommentAdded }) {
-  const { isLoggedIn, userId, username } = useContext(AuthContext);
+  const { isLoggedIn, username, authFetch } = useContext(AuthContext);
   const [comments, setComments] = useState([]);
   const [newCommentBody, setNewCommentBody] = useState('');
   const [loading, setLoading] = useState(true);
@@ -52,10 +52,9 @@ function CommentModal({ postId, onClose, onCommentAdded }) {
     }
 
     try {
-      const response = await fetch(`http://localhost:5000/posts/${postId}/comments`, {
+      const response = await authFetch(`/posts/${postId}/comments`, {
         method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ user_id: userId, body: newCommentBody }),
+        body: JSON.stringify({ body: newCommentBody }),
       });
       if (!response.ok) {
         const errorData = await response.json();
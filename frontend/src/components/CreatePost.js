@@ -1,13 +1,13 @@
 // brasfut-app/frontend/src/components/CreatePost.js
 
 import React, { useState, useContext } from 'react';
-import { AuthContext } from '../context/AuthContext'; // Note o caminho relativo // Para obter o user_id do usuário logado
+import { AuthContext } from '../context/AuthContext'; // Note o caminho relativo
 import '../App.css'; // Estilos globais
 
 function CreatePost({ onPostCreated }) {
   const [body, setBody] = useState('');
   const [message, setMessage] = useState('');
-  const { userId, isLoggedIn } = useContext(AuthContext); // Pega o userId e isLoggedIn do contexto
+  const { isLoggedIn, authFetch } = useContext(AuthContext); // O token do usuário logado vai no header via authFetch
 
   const handleSubmit = async (event) => {
     event.preventDefault();
@@ -30,12 +30,9 @@ function CreatePost({ onPostCreated }) {
     setMessage('Publicando post...');
 
     try {
-      const response = await fetch('http://localhost:5000/posts', {
+      const response = await authFetch('/posts', {
         method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-        },
-        body: JSON.stringify({ user_id: userId, body: body }), // Envia userId e body
+        body: JSON.stringify({ body: body }), // O autor vem do token
       });
 
       const data = await response.json();
@@ -8,7 +8,7 @@ import '../App.css';
 
 function ProfilePage() {
   const { username: urlUsername } = useParams();
-  const { userId: loggedInUserId, username: loggedInUsername, isLoggedIn } = useContext(AuthContext);
+  const { userId: loggedInUserId, username: loggedInUsername, isLoggedIn, authFetch } = useContext(AuthContext);
 
   const [profileUser, setProfileUser] = useState(null);
   const [userPosts, setUserPosts] = useState([]);
@@ -70,17 +70,11 @@ function ProfilePage() {
 
     const willFollow = !isFollowing;
     const actionUrl = willFollow
-      ? `http://localhost:5000/follow/${profileUser.id}`
-      : `http://localhost:5000/unfollow/${profileUser.id}`;
+      ? `/follow/${profileUser.id}`
+      : `/unfollow/${profileUser.id}`;
 
     try {
-      const response = await fetch(actionUrl, {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-        },
-        body: JSON.stringify({ follower_id: loggedInUserId }),
-      });
+      const response = await authFetch(actionUrl, { method: 'POST' });
 
       if (!response.ok) {
         const errorData = await response.json();
@@ -96,7 +90,7 @@ function ProfilePage() {
       setError(err.message);
       console.error('Erro ao seguir/deixar de seguir:', err);
     }
-  }, [isLoggedIn, isFollowing, loggedInUserId, profileUser]);
+  }, [isLoggedIn, isFollowing, profileUser, authFetch]);
 
 
   const handleLikeToggle = useCallback(async (postId, isCurrentlyLiked) => {
@@ -104,25 +98,16 @@ function ProfilePage() {
       alert('Você precisa estar logado para curtir ou descurtir um post!');
       return;
     }
-    const url = `http://localhost:5000/posts/${postId}/${isCurrentlyLiked ? 'unlike' : 'like'}`;
+    const url = `/posts/${postId}/${isCurrentlyLiked ? 'unlike' : 'like'}`;
     try {
-      const response = await fetch(url, {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ user_id: loggedInUserId }),
-      });
+      const response = await authFetch(url, { method: 'POST' });
       if (!response.ok) {
         const errorData = await response.json();
         throw new Error(errorData.message || 'Falha ao curtir/descurtir.');
       }
 
-      // NOVO: Buscar o post atualizado individualmente para uma atualização sutil
-      const updatedPostResponse = await fetch(`http://localhost:5000/posts/${postId}?logged_in_user_id=${loggedInUserId}`);
-      if (!updatedPostResponse.ok) {
-          console.warn(`Aviso: Falha ao carregar postagem individual atualizada para o post ${postId}.`);
-          return; // Não atualiza se não conseguir buscar o post atualizado
-      }
-      const updatedPost = await updatedPostResponse.json();
+      // A resposta do like/unlike já traz o post atualizado, sem um GET extra
+      const { post: updatedPost } = await response.json();
 
       setUserPosts(prevPosts => prevPosts.map(post =>
         post.id === updatedPost.id ? updatedPost : post // Substitui o post antigo pelo atualizado
@@ -133,7 +118,7 @@ function ProfilePage() {
       console.error('Erro ao curtir/descurtir:', err);
       alert(err.message);
     }
-  }, [isLoggedIn, loggedInUserId]);
+  }, [isLoggedIn, authFetch]);
 
 
   const handleCommentClick = useCallback((postId) => {
@@ -165,11 +150,7 @@ function ProfilePage() {
     }
 
     try {
-      const response = await fetch(`http://localhost:5000/posts/${postId}`, {
-        method: 'DELETE',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ user_id: loggedInUserId }),
-      });
+      const response = await authFetch(`/posts/${postId}`, { method: 'DELETE' });
 
       if (!response.ok) {
         const errorData = await response.json();
@@ -181,7 +162,7 @@ function ProfilePage() {
       console.error('Erro ao excluir post:', err);
       alert(err.message);
     }
-  }, [isLoggedIn, loggedInUserId, fetchUserProfileAndStatus]);
+  }, [isLoggedIn, loggedInUserId, authFetch, fetchUserProfileAndStatus]);
 
 
   if (loading) {
@@ -1,7 +1,9 @@
 // brasfut-app/frontend/src/context/AuthContext.js
 // ESTE ARQUIVO CONTÉM O PROVEDOR DE AUTENTICAÇÃO E O CONTEXTO
 
-import React, { createContext, useState, useEffect } from 'react';
+import React, { createContext, useState, useEffect, useCallback, useRef } from 'react';
+
+const API_URL = 'http://localhost:5000';
 
 // Exporta o Contexto para ser usado por componentes consumidores
 export const AuthContext = createContext();
@@ -11,12 +13,19 @@ export const AuthProvider = ({ children }) => {
   const [isLoggedIn, setIsLoggedIn] = useState(false);
   const [userId, setUserId] = useState(null);
   const [username, setUsername] = useState(null);
+  // Tokens assinados emitidos pelo /login; o de acesso vai no header
+  // Authorization das rotas de escrita e o de refresh renova o primeiro.
+  const tokensRef = useRef({ token: null, refreshToken: null });
 
   // Carrega o estado de autenticação do localStorage ao iniciar a aplicação
   useEffect(() => {
     try {
       const storedUserId = localStorage.getItem('userId');
       const storedUsername = localStorage.getItem('username');
+      tokensRef.current = {
+        token: localStorage.getItem('token'),
+        refreshToken: localStorage.getItem('refreshToken'),
+      };
 
       if (storedUserId && storedUsername) {
         setIsLoggedIn(true);
@@ -31,14 +40,21 @@ export const AuthProvider = ({ children }) => {
     }
   }, []); // Executa apenas uma vez na montagem
 
+  const storeTokens = (token, refreshToken) => {
+    tokensRef.current = { token, refreshToken };
+    localStorage.setItem('token', token);
+    localStorage.setItem('refreshToken', refreshToken);
+  };
+
   // Função para logar o usuário
-  const login = (id, user) => {
+  const login = (id, user, token, refreshToken) => {
     setIsLoggedIn(true);
     setUserId(id);
     setUsername(user);
     // Salva no localStorage
     localStorage.setItem('userId', id.toString());
     localStorage.setItem('username', user);
+    storeTokens(token, refreshToken);
     console.log('AuthContext: Usuário logado e salvo no localStorage:', user, id);
   };
 
@@ -50,11 +66,42 @@ export const AuthProvider = ({ children }) => {
     // Remove do localStorage
     localStorage.removeItem('userId');
     localStorage.removeItem('username');
+    localStorage.removeItem('token');
+    localStorage.removeItem('refreshToken');
+    tokensRef.current = { token: null, refreshToken: null };
     console.log('AuthContext: Usuário deslogado e removido do localStorage.');
   };
 
+  // fetch autenticado: envia o token de acesso e, se ele expirou (401),
+  // renova uma vez com o refresh token e repete a requisição.
+  const authFetch = useCallback(async (path, options = {}) => {
+    const send = () => fetch(`${API_URL}${path}`, {
+      ...options,
+      headers: {
+        'Content-Type': 'application/json',
+        ...options.headers,
+        Authorization: `Bearer ${tokensRef.current.token}`,
+      },
+    });
+
+    let response = await send();
+    if (response.status === 401 && tokensRef.current.refreshToken) {
+      const refreshResponse = await fetch(`${API_URL}/token/refresh`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ refresh_token: tokensRef.current.refreshToken }),
+      });
+      if (refreshResponse.ok) {
+        const data = await refreshResponse.json();
+        storeTokens(data.token, data.refresh_token);
+        response = await send();
+      }
+    }
+    return response;
+  }, []);
+
   return (
-    <AuthContext.Provider value={{ isLoggedIn, userId, username, login, logout }}>
+    <AuthContext.Provider value={{ isLoggedIn, userId, username, login, logout, authFetch }}>
       {children}
     </AuthContext.Provider>
   );